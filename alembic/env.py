@@ -17,6 +17,8 @@ if config.config_file_name is not None:
 # Import your Base class and models
 from config.database import Base  # Import Base from your project
 from models.search import SearchHistory  # Import models to make sure they are registered with the Base
+from models.analytics import SearchHourlyRollup, ArticleHourlyRollup
+from models.article_features import ArticleFeatures
 
 # Set the target metadata to the Base's metadata
 target_metadata = Base.metadata
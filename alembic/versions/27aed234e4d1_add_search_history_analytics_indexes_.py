@@ -0,0 +1,84 @@
+"""Add search history analytics indexes and hourly rollups
+
+Revision ID: 27aed234e4d1
+Revises: 75a07b2bddf7
+Create Date: 2026-10-18 10:30:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '27aed234e4d1'
+down_revision: Union[str, None] = '75a07b2bddf7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Keep in sync with db/rollups.py (hour_bucket, region_key, article_key)
+BACKFILL_SEARCH_ROLLUP = """
+INSERT INTO search_hourly_rollup (bucket, region, result, searches)
+SELECT date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+       LEFT(CASE json_typeof(region)
+                WHEN 'object' THEN COALESCE(NULLIF(region->>'region_name', ''), NULLIF(region->>'country_name', ''), 'unknown')
+                WHEN 'string' THEN COALESCE(NULLIF(region #>> '{}', ''), 'unknown')
+                ELSE 'unknown'
+            END, 100),
+       result,
+       COUNT(*)
+FROM search_history
+WHERE timestamp IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+BACKFILL_ARTICLE_ROLLUP = """
+INSERT INTO article_hourly_rollup (bucket, article, searches, positive)
+SELECT date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+       LEFT(COALESCE(NULLIF(wikipedia_data->>'title', ''), search_query), 255),
+       COUNT(*),
+       COUNT(*) FILTER (WHERE result = 'positive')
+FROM search_history
+WHERE timestamp IS NOT NULL
+GROUP BY 1, 2
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_search_history_timestamp'), 'search_history', ['timestamp'], unique=False)
+    op.create_index(op.f('ix_search_history_search_query'), 'search_history', ['search_query'], unique=False)
+    op.create_index(op.f('ix_search_history_result'), 'search_history', ['result'], unique=False)
+    op.create_table('search_hourly_rollup',
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('region', sa.String(length=100), nullable=False),
+    sa.Column('result', sa.String(length=20), nullable=False),
+    sa.Column('searches', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket', 'region', 'result')
+    )
+    op.create_table('article_hourly_rollup',
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('article', sa.String(length=255), nullable=False),
+    sa.Column('searches', sa.Integer(), nullable=False),
+    sa.Column('positive', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket', 'article')
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Expression index so ad-hoc lookups by region don't scan the JSON column
+        op.create_index('ix_search_history_region_name', 'search_history', [sa.text("(region->>'region_name')")], unique=False)
+        op.execute(BACKFILL_SEARCH_ROLLUP)
+        op.execute(BACKFILL_ARTICLE_ROLLUP)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_search_history_region_name', table_name='search_history')
+    op.drop_table('article_hourly_rollup')
+    op.drop_table('search_hourly_rollup')
+    op.drop_index(op.f('ix_search_history_result'), table_name='search_history')
+    op.drop_index(op.f('ix_search_history_search_query'), table_name='search_history')
+    op.drop_index(op.f('ix_search_history_timestamp'), table_name='search_history')
@@ -0,0 +1,40 @@
+"""Add project to article features
+
+Revision ID: 3c5e1f0b9a27
+Revises: 81d0c5aa7fde
+Create Date: 2026-10-18 14:20:11.532018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e1f0b9a27'
+down_revision: Union[str, None] = '81d0c5aa7fde'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Names the primary key when SQLite reflects it unnamed, so batch mode can drop it
+NAMING_CONVENTION = {"pk": "%(table_name)s_pkey"}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every stored article so far came from English Wikipedia
+    with op.batch_alter_table('article_features', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.add_column(sa.Column('project', sa.String(length=32), nullable=False, server_default='en'))
+        batch_op.drop_constraint('article_features_pkey', type_='primary')
+        batch_op.create_primary_key('article_features_pkey', ['project', 'title'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Only one project per title fits the old key
+    op.execute("DELETE FROM article_features WHERE project <> 'en'")
+    with op.batch_alter_table('article_features', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('article_features_pkey', type_='primary')
+        batch_op.create_primary_key('article_features_pkey', ['title'])
+        batch_op.drop_column('project')
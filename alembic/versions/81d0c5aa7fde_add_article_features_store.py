@@ -0,0 +1,67 @@
+"""Add article features store
+
+Revision ID: 81d0c5aa7fde
+Revises: 27aed234e4d1
+Create Date: 2026-10-18 11:02:47.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '81d0c5aa7fde'
+down_revision: Union[str, None] = '27aed234e4d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Seed the structural group from the newest history row per article. It is
+# stamped with the search time, so anything older than the freshness window is
+# simply refetched on next use. Pageviews aren't seeded: history rows hold them
+# in whatever shape the app wrote at the time. Title normalization mirrors
+# db/feature_store.py.
+BACKFILL_ARTICLE_FEATURES = """
+INSERT INTO article_features (title, article_length, num_categories, num_links, touched, structural_updated_at)
+SELECT DISTINCT ON (title) title, article_length, num_categories, num_links, touched, timestamp
+FROM (
+    SELECT LEFT(UPPER(LEFT(REPLACE(wikipedia_data->>'title', '_', ' '), 1))
+                || SUBSTRING(REPLACE(wikipedia_data->>'title', '_', ' ') FROM 2), 255) AS title,
+           (wikipedia_data->>'article_length')::int AS article_length,
+           (wikipedia_data->>'num_categories')::int AS num_categories,
+           (wikipedia_data->>'num_links')::int AS num_links,
+           to_char((timestamp - (wikipedia_data->>'recent_edit_days')::int * interval '1 day') AT TIME ZONE 'UTC',
+                   'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS touched,
+           timestamp
+    FROM search_history
+    WHERE timestamp IS NOT NULL
+      AND json_typeof(wikipedia_data) = 'object'
+      AND (wikipedia_data->>'article_length')::int > 0
+) AS history
+ORDER BY title, timestamp DESC
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('article_features',
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('article_length', sa.Integer(), nullable=True),
+    sa.Column('num_categories', sa.Integer(), nullable=True),
+    sa.Column('num_links', sa.Integer(), nullable=True),
+    sa.Column('touched', sa.String(length=20), nullable=True),
+    sa.Column('structural_updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('pageviews', sa.JSON(), nullable=True),
+    sa.Column('pageviews_updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('title', name='article_features_pkey')
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(BACKFILL_ARTICLE_FEATURES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('article_features')
@@ -0,0 +1,32 @@
+"""Reset article features pageviews
+
+Revision ID: 9b4d7e2a6c13
+Revises: 3c5e1f0b9a27
+Create Date: 2026-10-18 16:05:37.214870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4d7e2a6c13'
+down_revision: Union[str, None] = '3c5e1f0b9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stored pageview groups were written in other shapes (zero-filled,
+    # 20-day windows, copied from history) than the model's feature window;
+    # clear them so they are refetched on next use
+    op.execute(sa.text("UPDATE article_features SET pageviews = NULL, pageviews_updated_at = NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Nothing to restore: cleared groups are refetched on demand
+    pass
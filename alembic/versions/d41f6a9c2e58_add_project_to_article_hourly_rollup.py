@@ -0,0 +1,73 @@
+"""Add project to article hourly rollup
+
+Revision ID: d41f6a9c2e58
+Revises: 9b4d7e2a6c13
+Create Date: 2026-10-18 16:40:52.630194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f6a9c2e58'
+down_revision: Union[str, None] = '9b4d7e2a6c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Names the primary key when SQLite reflects it unnamed, so batch mode can drop it
+NAMING_CONVENTION = {"pk": "%(table_name)s_pkey"}
+
+# Keep in sync with db/rollups.py (hour_bucket, project_key, article_key)
+REBUILD_ARTICLE_ROLLUP = """
+INSERT INTO article_hourly_rollup (bucket, project, article, searches, positive)
+SELECT date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+       LEFT(LOWER(SPLIT_PART(SPLIT_PART(REGEXP_REPLACE(BTRIM(search_query), '^[A-Za-z]+://', ''), '/', 1), '.', 1)), 32),
+       LEFT(COALESCE(NULLIF(wikipedia_data->>'title', ''), search_query), 255),
+       COUNT(*),
+       COUNT(*) FILTER (WHERE result = 'positive')
+FROM search_history
+WHERE timestamp IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+# The rollup as 27aed234e4d1 built it, keyed by title only
+REBUILD_TITLE_ROLLUP = """
+INSERT INTO article_hourly_rollup (bucket, article, searches, positive)
+SELECT date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+       LEFT(COALESCE(NULLIF(wikipedia_data->>'title', ''), search_query), 255),
+       COUNT(*),
+       COUNT(*) FILTER (WHERE result = 'positive')
+FROM search_history
+WHERE timestamp IS NOT NULL
+GROUP BY 1, 2
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('article_hourly_rollup', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.add_column(sa.Column('project', sa.String(length=32), nullable=False, server_default='en'))
+        batch_op.drop_constraint('article_hourly_rollup_pkey', type_='primary')
+        batch_op.create_primary_key('article_hourly_rollup_pkey', ['bucket', 'project', 'article'])
+
+    # Rows written since several projects were served merged same-titled
+    # articles; split them again from history where the backfill SQL runs
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DELETE FROM article_hourly_rollup")
+        op.execute(REBUILD_ARTICLE_ROLLUP)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    # Only one project per title fits the old key
+    op.execute("DELETE FROM article_hourly_rollup" if is_postgresql else "DELETE FROM article_hourly_rollup WHERE project <> 'en'")
+    with op.batch_alter_table('article_hourly_rollup', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('article_hourly_rollup_pkey', type_='primary')
+        batch_op.create_primary_key('article_hourly_rollup_pkey', ['bucket', 'article'])
+        batch_op.drop_column('project')
+    if is_postgresql:
+        op.execute(REBUILD_TITLE_ROLLUP)
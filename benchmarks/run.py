@@ -0,0 +1,335 @@
+"""Load benchmark for the upstream-heavy endpoints.
+
+Starts the stub upstream and the app (both under uvicorn, each in its own
+process), drives /search, /top-trending, /on-this-day and /engagement-chart
+at a fixed concurrency and writes latency percentiles, throughput and
+upstream calls per request to benchmarks/results/<commit>-<time>.json.
+
+    python -m benchmarks.run --concurrency 32 --requests 500 --latency 0.05
+    python -m benchmarks.run compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+SCENARIOS = ("search", "top-trending", "on-this-day", "engagement-chart")
+
+CREATE_TABLES = (
+    "from config.database import Base, engine\n"
+    "import models.search, models.analytics, models.article_features\n"
+    "Base.metadata.create_all(engine)\n"
+)
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def git_revision() -> Dict[str, str]:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def article_urls(count: int) -> List[str]:
+    return [f"https://en.wikipedia.org/wiki/Benchmark_article_{i}" for i in range(count)]
+
+
+def client_ips(count: int) -> List[str]:
+    # Public (TEST-NET excluded) addresses so region lookups reach ipstack when enabled
+    return [f"8.{8 + i // 250}.{i % 250}.{1 + i % 200}" for i in range(count)]
+
+
+def build_request(scenario: str, rng: random.Random, urls: List[str], ips: List[str], forecast_model: str):
+    """(method, path, kwargs) for one request of a scenario."""
+    if scenario == "search":
+        return "POST", "/api/wikipedia/search", {
+            "json": {"search": rng.choice(urls)},
+            "headers": {"X-Forwarded-For": rng.choice(ips), "User-Agent": "wiki-bench"},
+        }
+    if scenario == "engagement-chart":
+        return "GET", "/api/wikipedia/engagement-chart", {"params": {"wiki_url": rng.choice(urls), "model": forecast_model}}
+    return "GET", f"/api/wikipedia/{scenario}", {}
+
+
+class Process:
+    """A child process started from the repo root, stopped on exit."""
+
+    def __init__(self, args: List[str], env: Dict[str, str], log_path: str):
+        self.log = open(log_path, "w")
+        self.proc = subprocess.Popen(args, cwd=ROOT, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+
+    def stop(self):
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.log.close()
+
+
+def ensure_port_free(port: int):
+    # A server left over from an earlier run would silently be benchmarked instead
+    with socket.socket() as sock:
+        if sock.connect_ex(("127.0.0.1", port)) == 0:
+            raise RuntimeError(f"Something is already listening on port {port}")
+
+
+async def wait_until_ready(client: httpx.AsyncClient, url: str, process: Process, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.proc.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.proc.returncode}, see {process.log.name}")
+        try:
+            if (await client.get(url)).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+async def run_scenario(app: httpx.AsyncClient, stub: httpx.AsyncClient, scenario: str, args) -> dict:
+    rng = random.Random(args.seed)
+    urls = article_urls(args.articles)
+    ips = client_ips(args.articles)
+    latencies: List[float] = []
+    statuses = Counter()
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        method, path, kwargs = build_request(scenario, rng, urls, ips, args.forecast_model)
+        started = time.perf_counter()
+        try:
+            response = await app.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            failures += 1
+            return
+        latencies.append(time.perf_counter() - started)
+        statuses[str(response.status_code)] += 1
+        # Handlers report most upstream failures as a 200 with an "error" key
+        body = response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+        if response.status_code >= 400 or (isinstance(body, dict) and "error" in body):
+            failures += 1
+
+    async def drive(total: int):
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                await one()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+    if args.warmup:
+        await drive(args.warmup)
+    latencies.clear()
+    statuses.clear()
+    failures = 0
+    await stub.post("/_stub/reset")
+
+    started = time.perf_counter()
+    await drive(args.requests)
+    duration = time.perf_counter() - started
+
+    upstream = (await stub.get("/_stub/stats")).json()
+    ordered = sorted(latencies)
+    calls = sum(upstream["calls"].values())
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(args.requests / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 50) * 1000, 2),
+            "p95": round(percentile(ordered, 95) * 1000, 2),
+            "p99": round(percentile(ordered, 99) * 1000, 2),
+            "mean": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+            "max": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        },
+        "statuses": dict(statuses),
+        "failures": failures,
+        "upstream_calls": upstream["calls"],
+        "upstream_errors": upstream["errors"],
+        "upstream_calls_per_request": round(calls / args.requests, 3),
+    }
+
+
+async def benchmark(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="wiki-bench-")
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "HTTP_UPSTREAM_OVERRIDE": stub_url,
+        "STARTUP_MODE": "eager",
+        "ALLOW_IP": "Yes" if args.region_lookups else "No",
+        "IPSTACK_API_KEY": os.environ.get("IPSTACK_API_KEY", "benchmark"),
+        "LOG_FILE": os.path.join(workdir, "app.log"),
+        "PYTHONPATH": ROOT,
+    }
+    ensure_port_free(args.stub_port)
+    ensure_port_free(args.app_port)
+    subprocess.run([sys.executable, "-c", CREATE_TABLES], cwd=ROOT, env=env, check=True)
+
+    stub_process = Process(
+        [sys.executable, "-m", "benchmarks.stub_server", "--port", str(args.stub_port), "--latency", str(args.latency),
+         "--jitter", str(args.jitter), "--error-rate", str(args.error_rate), "--seed", str(args.seed)],
+        env, os.path.join(workdir, "stub.log"),
+    )
+    app_process = Process(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.app_port), "--log-level", "warning",
+         "--no-access-log"],
+        env, os.path.join(workdir, "uvicorn.log"),
+    )
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=app_url, timeout=args.timeout, limits=limits) as app, \
+                httpx.AsyncClient(base_url=stub_url, timeout=10) as stub:
+            await wait_until_ready(stub, "/_stub/stats", stub_process)
+            await wait_until_ready(app, "/api", app_process)
+            scenarios = {}
+            for scenario in args.scenarios:
+                print(f"-> {scenario}: {args.requests} requests at concurrency {args.concurrency}", flush=True)
+                scenarios[scenario] = await run_scenario(app, stub, scenario, args)
+                print_scenario(scenario, scenarios[scenario])
+    finally:
+        app_process.stop()
+        stub_process.stop()
+
+    return {
+        "label": args.label,
+        "git": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "articles": args.articles,
+            "stub_latency": args.latency,
+            "stub_jitter": args.jitter,
+            "stub_error_rate": args.error_rate,
+            "region_lookups": args.region_lookups,
+            "forecast_model": args.forecast_model,
+            "seed": args.seed,
+        },
+        "workdir": workdir,
+        "scenarios": scenarios,
+    }
+
+
+def print_scenario(name: str, result: dict):
+    latency = result["latency_ms"]
+    print(
+        f"   {name:<17} {result['throughput_rps']:>9.1f} req/s  p50 {latency['p50']:>8.2f}ms  "
+        f"p95 {latency['p95']:>8.2f}ms  p99 {latency['p99']:>8.2f}ms  "
+        f"upstream/req {result['upstream_calls_per_request']:>6.2f}  failures {result['failures']}",
+        flush=True,
+    )
+
+
+def compare(old_path: str, new_path: str):
+    """Print per-scenario deltas between two result files."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    def change(before: float, after: float) -> str:
+        if not before:
+            return "     n/a"
+        return f"{(after - before) / before * 100:+7.1f}%"
+
+    print(f"old: {old['git'].get('commit')} {old['timestamp']}  new: {new['git'].get('commit')} {new['timestamp']}")
+    if old["config"] != new["config"]:
+        print("warning: the two runs used different settings")
+    rows = (
+        ("throughput_rps", lambda r: r["throughput_rps"]),
+        ("p50_ms", lambda r: r["latency_ms"]["p50"]),
+        ("p95_ms", lambda r: r["latency_ms"]["p95"]),
+        ("p99_ms", lambda r: r["latency_ms"]["p99"]),
+        ("upstream/req", lambda r: r["upstream_calls_per_request"]),
+        ("failures", lambda r: r["failures"]),
+    )
+    for scenario in new["scenarios"]:
+        if scenario not in old["scenarios"]:
+            continue
+        print(scenario)
+        for label, get in rows:
+            before, after = get(old["scenarios"][scenario]), get(new["scenarios"][scenario])
+            print(f"   {label:<15} {before:>10.2f} -> {after:>10.2f}  {change(before, after)}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        parser = argparse.ArgumentParser(prog="python -m benchmarks.run compare")
+        parser.add_argument("old")
+        parser.add_argument("new")
+        args = parser.parse_args(sys.argv[2:])
+        compare(args.old, args.new)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--articles", type=int, default=200, help="distinct article URLs and client IPs")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub upstream latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--region-lookups", action="store_true", help="set ALLOW_IP so /search resolves client regions")
+    parser.add_argument("--forecast-model", default="log_linear")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--app-port", type=int, default=8901)
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--label", default="", help="free text stored with the results")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>-<time>.json)")
+    args = parser.parse_args()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    result = asyncio.run(benchmark(args))
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(RESULTS_DIR, f"{result['git']['commit'] or 'unknown'}-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Local stand-in for the Wikimedia and ipstack APIs used by the benchmarks.
+
+Replays the recorded responses in benchmarks/fixtures. The app reaches it
+through HTTP_UPSTREAM_OVERRIDE, which keeps the original path and query and
+moves the real host into the X-Upstream-Host header. Every response can be
+delayed (`latency` + up to `jitter` seconds) and a share of them
+(`error_rate`) replaced by 429/503 errors to exercise retries and the
+rate governor.
+
+    python -m benchmarks.stub_server --port 8900 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixture(name: str):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def endpoint_name(request: Request) -> str:
+    path = request.url.path
+    if request.headers.get("x-upstream-host", "").endswith("ipstack.com"):
+        return "ipstack"
+    if path.endswith("/w/api.php"):
+        return f"action:{request.query_params.get('prop', '')}"
+    if "/metrics/pageviews/per-article/" in path:
+        return "pageviews"
+    if "/metrics/pageviews/top/" in path:
+        return "top_pageviews"
+    if "/feed/onthisday/" in path:
+        return "onthisday"
+    return "unknown"
+
+
+class StubUpstream:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.errors = Counter()
+        self.fixtures = {
+            "info": load_fixture("action_info.json"),
+            "categories": load_fixture("action_categories.json"),
+            "links": load_fixture("action_links.json"),
+            "pageviews": load_fixture("pageviews_per_article.json"),
+            "top_pageviews": load_fixture("pageviews_top.json"),
+            "onthisday": load_fixture("onthisday.json"),
+            "ipstack": load_fixture("ipstack.json"),
+        }
+
+    async def handle(self, request: Request):
+        name = endpoint_name(request)
+        self.calls[name] += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors[name] += 1
+            if self.random.random() < 0.5:
+                return JSONResponse({"error": "throttled"}, status_code=429, headers={"Retry-After": "1"})
+            return JSONResponse({"error": "unavailable"}, status_code=503)
+
+        if name.startswith("action:"):
+            return JSONResponse(self.action(request))
+        if name == "pageviews":
+            return JSONResponse(self.pageviews(request))
+        if name in ("top_pageviews", "onthisday", "ipstack"):
+            return JSONResponse(self.fixtures[name])
+        return JSONResponse({"error": "not recorded"}, status_code=404)
+
+    @staticmethod
+    def pages(recorded: dict, titles) -> dict:
+        """Copy the recorded page once per title, normalizing titles the way
+        the real API does (underscores to spaces, first letter upper-cased)."""
+        template = next(iter(recorded["query"]["pages"].values()))
+        query = {"pages": {}}
+        normalized = []
+        for i, title in enumerate(titles, start=1):
+            canonical = title.replace("_", " ")
+            canonical = canonical[:1].upper() + canonical[1:]
+            if canonical != title:
+                normalized.append({"from": title, "to": canonical})
+            query["pages"][str(i)] = {**template, "pageid": i, "title": canonical}
+        if normalized:
+            query["normalized"] = normalized
+        return query
+
+    def action(self, request: Request) -> dict:
+        """Replay a recorded action API page for every requested title."""
+        params = request.query_params
+        titles = params.get("titles", "").split("|")
+        prop = params.get("prop", "info")
+        if prop == "info":
+            return {"batchcomplete": "", "query": self.pages(self.fixtures["info"], titles)}
+
+        # Recorded continuation pages, replayed in order with our own tokens
+        recorded = self.fixtures[prop]
+        prefix = "cl" if prop == "categories" else "pl"
+        index = int(params.get(f"{prefix}continue", "0|0").split("|")[1])
+        body = {"query": self.pages(recorded[min(index, len(recorded) - 1)], titles)}
+        if index + 1 < len(recorded):
+            body["continue"] = {f"{prefix}continue": f"bench|{index + 1}", "continue": "||"}
+        else:
+            body["batchcomplete"] = ""
+        return body
+
+    def pageviews(self, request: Request) -> dict:
+        """Recorded daily views, re-dated to the requested range."""
+        parts = request.url.path.rstrip("/").split("/")
+        title, start, end = parts[-4], parts[-2], parts[-1]
+        recorded = self.fixtures["pageviews"]["items"]
+        day = datetime.strptime(start[:8], "%Y%m%d")
+        last = datetime.strptime(end[:8], "%Y%m%d")
+        items = []
+        while day <= last:
+            item = recorded[len(items) % len(recorded)]
+            items.append({**item, "article": title, "timestamp": day.strftime("%Y%m%d00")})
+            day += timedelta(days=1)
+        return {"items": items}
+
+    async def stats(self, request: Request):
+        return JSONResponse({"calls": dict(self.calls), "errors": dict(self.errors)})
+
+    async def reset(self, request: Request):
+        self.calls.clear()
+        self.errors.clear()
+        return JSONResponse({"ok": True})
+
+
+def create_app(stub: StubUpstream) -> Starlette:
+    return Starlette(routes=[
+        Route("/_stub/stats", stub.stats),
+        Route("/_stub/reset", stub.reset, methods=["POST"]),
+        Route("/{path:path}", stub.handle),
+    ])
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, uniformly")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of responses replaced by 429/503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = StubUpstream(args.latency, args.jitter, args.error_rate, args.seed)
+    uvicorn.run(create_app(stub), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
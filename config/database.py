@@ -1,20 +1,53 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config.env import Env
 
+# Async driver to use for each sync DATABASE_URL backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# libpq options asyncpg doesn't understand
+LIBPQ_ONLY_PARAMS = ("sslmode", "channel_binding")
+
+def to_async_url(database_url: str):
+    """Turn a sync DATABASE_URL into its asyncpg/aiosqlite equivalent."""
+    url = make_url(database_url)
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    if "sslmode" in url.query and url.get_backend_name() == "postgresql":
+        url = url.update_query_dict({"ssl": url.query["sslmode"]})
+    return url.difference_update_query(LIBPQ_ONLY_PARAMS)
+
 # Create the SQLAlchemy engine
 engine = create_engine(
     Env.DATABASE_URL,
-    pool_size=5, 
-    max_overflow=10,
-    pool_timeout=30,
-    echo=True
+    pool_size=Env.DB_POOL_SIZE,
+    max_overflow=Env.DB_MAX_OVERFLOW,
+    pool_timeout=Env.DB_POOL_TIMEOUT,
+    echo=Env.DB_ECHO
+)
+
+# Async engine for the service layer, so queries don't block the event loop
+async_engine = create_async_engine(
+    to_async_url(Env.DATABASE_URL),
+    pool_size=Env.DB_POOL_SIZE,
+    max_overflow=Env.DB_MAX_OVERFLOW,
+    pool_timeout=Env.DB_POOL_TIMEOUT,
+    echo=Env.DB_ECHO
 )
 
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async session factory; objects stay usable after commit
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 # Declare the base class for models
 Base = declarative_base()
 
@@ -6,4 +6,136 @@ load_dotenv()
 class Env:
     DATABASE_URL = os.getenv("DATABASE_URL")
     ALLOW_IP= os.getenv("ALLOW_IP")
-    IPSTACK_API_KEY = os.getenv("IPSTACK_API_KEY")
\ No newline at end of file
+    IPSTACK_API_KEY = os.getenv("IPSTACK_API_KEY")
+
+    # Outbound HTTP client (utils/http_client.py)
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+    # Connection limits apply to each pool: one per wiki project, plus one per other host
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "50"))
+    HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "100"))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+    HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+    HTTP_UPSTREAM_OVERRIDE = os.getenv("HTTP_UPSTREAM_OVERRIDE")  # benchmarks only: send every upstream call to this base URL
+
+    # Wikipedia language editions served (utils/wiki_projects.py), by language code
+    WIKI_PROJECTS = [code.strip().lower() for code in os.getenv("WIKI_PROJECTS", "en,de,fr,ja,es").split(",") if code.strip()]
+    WIKI_DEFAULT_PROJECT = os.getenv("WIKI_DEFAULT_PROJECT", "en")
+
+    # Upstream response cache (utils/cache.py)
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    CACHE_PROJECT_ENTRIES = int(os.getenv("CACHE_PROJECT_ENTRIES", "1024"))  # per wiki project partition
+    CACHE_BACKEND_PATH = os.getenv("CACHE_BACKEND_PATH")  # optional SQLite file shared across workers
+
+    # Daily feed precomputation (service/feed_scheduler.py)
+    FEED_PROJECTS = [code.strip().lower() for code in os.getenv("FEED_PROJECTS", "en").split(",") if code.strip()]  # others are added on first request
+    FEED_TIMEZONES = [tz.strip() for tz in os.getenv("FEED_TIMEZONES", "UTC").split(",") if tz.strip()]
+    FEED_REFRESH_INTERVAL = float(os.getenv("FEED_REFRESH_INTERVAL", "1800"))
+    FEED_PREFETCH_LEAD = float(os.getenv("FEED_PREFETCH_LEAD", "900"))  # seconds before UTC midnight
+
+    # Maximum number of URLs accepted by POST /api/wikipedia/search/batch
+    BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "500"))
+
+    # Database
+    DB_ECHO = os.getenv("DB_ECHO", "No") == "Yes"
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+    # Write-behind search history queue (db/history_writer.py)
+    HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+    HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500"))
+    HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "0.5"))
+    HISTORY_ENQUEUE_TIMEOUT = float(os.getenv("HISTORY_ENQUEUE_TIMEOUT", "0.05"))
+    HISTORY_MAX_RETRIES = int(os.getenv("HISTORY_MAX_RETRIES", "3"))
+    HISTORY_EXPORT_MAX_ROWS = int(os.getenv("HISTORY_EXPORT_MAX_ROWS", "100000"))  # per /history/export call
+
+    # Sent as X-Admin-Token to reach admin endpoints (history export, model reload); unset disables them
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # Persistent feature store freshness, in seconds (db/feature_store.py)
+    FEATURE_PAGEVIEWS_TTL = float(os.getenv("FEATURE_PAGEVIEWS_TTL", str(6 * 3600)))
+    FEATURE_STRUCTURAL_TTL = float(os.getenv("FEATURE_STRUCTURAL_TTL", str(24 * 3600)))
+
+    # Local pageview index built from the public dumps (utils/pageview_index.py); unset to always use the API
+    PAGEVIEW_INDEX_DIR = os.getenv("PAGEVIEW_INDEX_DIR")
+    PAGEVIEW_INDEX_DAYS = int(os.getenv("PAGEVIEW_INDEX_DAYS", "30"))  # days kept per project
+    PAGEVIEW_INDEX_RELOAD = float(os.getenv("PAGEVIEW_INDEX_RELOAD", "60"))  # seconds between checks for a re-ingested file
+    PAGEVIEW_INGEST_RUN_SIZE = int(os.getenv("PAGEVIEW_INGEST_RUN_SIZE", "1000000"))  # totals held in memory before a sorted run is spilled
+
+    # Trending by view acceleration over the pageview index (utils/trending.py)
+    TRENDING_WINDOW_DAYS = int(os.getenv("TRENDING_WINDOW_DAYS", "1"))  # recent days scored
+    TRENDING_BASELINE_DAYS = int(os.getenv("TRENDING_BASELINE_DAYS", "7"))  # days before them each article is compared against
+    TRENDING_MIN_VIEWS = int(os.getenv("TRENDING_MIN_VIEWS", "1000"))  # recent daily mean needed to be a candidate
+    TRENDING_SMOOTHING = float(os.getenv("TRENDING_SMOOTHING", "100"))  # damps scores of articles with a tiny baseline
+    TRENDING_TOP_K = int(os.getenv("TRENDING_TOP_K", "4"))
+
+    # Stop paginating categories/links once an article has this many (utils/wikipedia_helper.py)
+    FEATURE_COUNT_CAP = int(os.getenv("FEATURE_COUNT_CAP", "5000"))
+
+    # Outbound rate governor (utils/rate_governor.py): sustained requests/second per endpoint and wiki project
+    RATE_ACTION_API = float(os.getenv("RATE_ACTION_API", "50"))
+    RATE_PAGEVIEWS_API = float(os.getenv("RATE_PAGEVIEWS_API", "100"))
+    RATE_FEED_API = float(os.getenv("RATE_FEED_API", "50"))
+    RATE_IPSTACK = float(os.getenv("RATE_IPSTACK", "10"))
+    RATE_DEFAULT = float(os.getenv("RATE_DEFAULT", "50"))
+    GOVERNOR_INITIAL_CONCURRENCY = int(os.getenv("GOVERNOR_INITIAL_CONCURRENCY", "10"))
+    GOVERNOR_TARGET_LATENCY = float(os.getenv("GOVERNOR_TARGET_LATENCY", "1.0"))  # seconds
+    GOVERNOR_DEFAULT_PAUSE = float(os.getenv("GOVERNOR_DEFAULT_PAUSE", "1.0"))  # when a 429 has no Retry-After
+
+    # IP -> region resolution (utils/region_resolver.py)
+    GEOIP_DATABASE_PATH = os.getenv("GEOIP_DATABASE_PATH")  # optional range database built with `python -m utils.region_resolver`
+    REGION_CACHE_SIZE = int(os.getenv("REGION_CACHE_SIZE", "10000"))
+    REGION_CACHE_TTL = float(os.getenv("REGION_CACHE_TTL", str(24 * 3600)))
+    REGION_REMOTE_TIMEOUT = float(os.getenv("REGION_REMOTE_TIMEOUT", "5"))
+
+    # Model serving (service/model_registry.py): "name=path" pairs, comma separated
+    MODEL_VERSIONS = dict(
+        pair.strip().split("=", 1)
+        for pair in os.getenv(
+            "MODEL_VERSIONS",
+            "logistic_regression_model=service/logistic_regression_model.pkl,"
+            "logistic_regression_model_1=service/logistic_regression_model_1.pkl",
+        ).split(",")
+        if pair.strip()
+    )
+    MODEL_DEFAULT_VERSION = os.getenv("MODEL_DEFAULT_VERSION", "logistic_regression_model")
+    # "background" warms imports and the default model after startup, "eager" blocks startup on it, "lazy" skips it
+    STARTUP_MODE = os.getenv("STARTUP_MODE", "background")
+    MODEL_BATCH_WINDOW = float(os.getenv("MODEL_BATCH_WINDOW", "0.003"))  # seconds
+    MODEL_MAX_BATCH = int(os.getenv("MODEL_MAX_BATCH", "256"))
+
+    # Add a Server-Timing header (upstream/model/db/total) to every API response
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "No") == "Yes"
+
+    # Response compression and HTTP caching (middleware/http_cache_middleware.py)
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes; smaller bodies are sent as-is
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))  # gzip level
+    # "path=max-age seconds" pairs, comma separated; these paths get ETags and Cache-Control, so they must
+    # answer the same URL with the same body (not on-this-day, which samples at random; it is only compressed)
+    HTTP_CACHE_MAX_AGE = {
+        path.strip(): int(seconds)
+        for path, seconds in (
+            pair.split("=", 1)
+            for pair in os.getenv(
+                "HTTP_CACHE_MAX_AGE",
+                "/api/wikipedia/top-trending=3600,"
+                "/api/wikipedia/engagement-chart=3600",
+            ).split(",")
+            if pair.strip()
+        )
+    }
+
+    # Request logging (middleware/auth_middleware.py): share of normal requests logged, plus every slow or failed one
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+    LOG_SLOW_REQUEST = float(os.getenv("LOG_SLOW_REQUEST", "1.0"))  # seconds
+
+    # Structured JSON log file (utils/log_sink.py)
+    LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+    LOG_ROTATION_BYTES = int(os.getenv("LOG_ROTATION_BYTES", str(30 * 1024 * 1024)))
+    LOG_RETENTION_DAYS = float(os.getenv("LOG_RETENTION_DAYS", "30"))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))
+    LOG_DEDUP_WINDOW = float(os.getenv("LOG_DEDUP_WINDOW", "1.0"))  # fold identical consecutive messages within this many seconds
+    LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")  # e.g. "service.wikipedia_service=0.2,controller=0.5"
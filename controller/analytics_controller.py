@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.connect_db import get_async_db
+from service.analytics_service import get_window, top_searched_articles, result_ratio_over_time, searches_per_region
+from utils.wiki_projects import get_project
+
+analytics_router = APIRouter()
+
+# Windows default to the last `hours` hours; all queries read the hourly rollup tables
+
+
+@analytics_router.get("/top-articles", summary="Most searched articles")
+async def top_articles(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    hours: int = Query(24, ge=1, le=24 * 366),
+    limit: int = Query(10, ge=1, le=100),
+    project: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        if project is not None:
+            project = get_project(project).code
+        return await top_searched_articles(db, *get_window(start, end, hours), limit, project)
+    except Exception as e:
+        logger.error(f"Failed to get top articles: {e}")
+        return {"error": str(e)}
+
+
+@analytics_router.get("/result-ratio", summary="Positive/negative ratio per hour")
+async def result_ratio(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    hours: int = Query(24, ge=1, le=24 * 366),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await result_ratio_over_time(db, *get_window(start, end, hours))
+    except Exception as e:
+        logger.error(f"Failed to get result ratio: {e}")
+        return {"error": str(e)}
+
+
+@analytics_router.get("/searches-by-region", summary="Searches per region per hour")
+async def searches_by_region(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    hours: int = Query(24, ge=1, le=24 * 366),
+    region: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await searches_per_region(db, *get_window(start, end, hours), region)
+    except Exception as e:
+        logger.error(f"Failed to get searches by region: {e}")
+        return {"error": str(e)}
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
-from db.connect_db import get_db
-from schema.wikipedia_schema import SearchModel
-from service.wikipedia_service import search_in_model_service,get_on_this_day_data,get_top_trending_articles,article_engagement
+from fastapi import APIRouter, Depends, Query, Request
+from config.env import Env
+from db.connect_db import async_session_scope
+from middleware.auth_middleware import require_admin_token
+from schema.wikipedia_schema import SearchModel, BatchSearchModel
+from service.wikipedia_service import search_in_model_service,search_in_model_batch_service,stream_batch_search_service,export_search_history,article_engagement,model_registry
+from service.feed_scheduler import feed_scheduler
+from db.history_writer import history_writer
+from utils.cache import get_cache_stats
+from utils.rate_governor import rate_governor
+from utils.region_resolver import region_resolver
+from utils.pageview_index import pageview_index
+from utils.streaming import wants_ndjson, ndjson_response
 from loguru import logger
 from fastapi import Header
 from typing import Optional
@@ -12,7 +20,6 @@ wikipedia_router = APIRouter()
 @wikipedia_router.post("/search", summary="Search in a model")
 async def search_in_model(
     search: SearchModel,
-    db: Session = Depends(get_db),
     request: Request = None,    
     user_agent: Optional[str] = Header(None)
 ):
@@ -21,45 +28,110 @@ async def search_in_model(
     if isinstance(ip_address, str) and ',' in ip_address:
         ip_address = ip_address.split(',')[0]
     
-    # Log the search query, IP address, and User-Agent
-    logger.info(f"Received search query: '{search.search}' from IP: {ip_address} using User-Agent: {user_agent}")
-    
     try:
         # Perform the search and store the result
-        result = search_in_model_service(search.search, db, ip_address, user_agent)
+        result = await search_in_model_service(search.search, ip_address, user_agent)
         return result
     except Exception as e:
         logger.error(f"Failed to process search: {e}")
         return {"error": str(e)}
 
 
+@wikipedia_router.post("/search/batch", summary="Search many Wikipedia URLs in one model call")
+async def search_in_model_batch(
+    batch: BatchSearchModel,
+    request: Request = None,
+    user_agent: Optional[str] = Header(None),
+    stream: bool = False
+):
+    ip_address = request.headers.get('X-Forwarded-For', request.client.host)
+    if isinstance(ip_address, str) and ',' in ip_address:
+        ip_address = ip_address.split(',')[0]
+
+    if wants_ndjson(request, stream):
+        return ndjson_response(stream_batch_search_service(batch.searches, ip_address, user_agent))
+
+    try:
+        return await search_in_model_batch_service(batch.searches, ip_address, user_agent)
+    except Exception as e:
+        logger.error(f"Failed to process batch search: {e}")
+        return {"error": str(e)}
+
+
+@wikipedia_router.get("/history/export", summary="Export search history", dependencies=[Depends(require_admin_token)])
+async def export_history(limit: Optional[int] = Query(None, ge=1, le=Env.HISTORY_EXPORT_MAX_ROWS)):
+    # Always streamed, so memory stays bounded by the export batch size.
+    # The request-scoped session is closed before the body streams
+    async def records():
+        async with async_session_scope() as db:
+            async for record in export_search_history(db, limit):
+                yield record
+    return ndjson_response(records())
+
+
 @wikipedia_router.get("/on-this-day", summary="Get search history")
-def on_this_day():
+async def on_this_day(timezone: str = "UTC", project: Optional[str] = None, seed: Optional[int] = None):
     logger.info("Received request for on this day data.")
     try:
-        result = get_on_this_day_data()
+        result = await feed_scheduler.get_on_this_day(timezone, project, seed)
         return result
     except Exception as e:
         logger.error(f"Failed to get on this day data: {e}")
         return {"error": str(e)}
     
 @wikipedia_router.get("/top-trending", summary="Get top trending articles")
-def top_trending():
+async def top_trending(project: Optional[str] = None):
     logger.info("Received request for top trending articles.")
     try:
-        result = get_top_trending_articles()
+        result = await feed_scheduler.get_top_trending(project)
         return result
     except Exception as e:
         logger.error(f"Failed to get top trending articles: {e}")
         return {"error": str(e)}
     
 @wikipedia_router.get("/engagement-chart", summary="Get engagement chart")
-def engagement_chart(wiki_url: str):
+async def engagement_chart(wiki_url: str, model: str = "log_linear", project: Optional[str] = None):
     logger.info("Received request for engagement chart.")
     try:
         # Placeholder for engagement chart data
-        result = article_engagement(wiki_url)
+        result = await article_engagement(wiki_url, model, project)
         return result
     except Exception as e:
         logger.error(f"Failed to get engagement chart: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+@wikipedia_router.get("/cache-stats", summary="Get upstream cache hit/miss counters")
+async def cache_stats():
+    return get_cache_stats()
+
+@wikipedia_router.get("/models", summary="List model versions and micro-batching counters")
+async def list_models():
+    return model_registry.get_stats()
+
+@wikipedia_router.post(
+    "/models/{version}/reload",
+    summary="Reload a model version from its artifact without a restart",
+    dependencies=[Depends(require_admin_token)],
+)
+async def reload_model(version: str):
+    try:
+        return await model_registry.reload(version)
+    except Exception as e:
+        logger.error(f"Failed to reload model '{version}': {e}")
+        return {"error": str(e)}
+
+@wikipedia_router.get("/upstream-stats", summary="Get outbound rate governor state per Wikimedia endpoint")
+async def upstream_stats():
+    return rate_governor.get_stats()
+
+@wikipedia_router.get("/region-stats", summary="Get IP-to-region resolution counters")
+async def region_stats():
+    return region_resolver.get_stats()
+
+@wikipedia_router.get("/pageview-index-stats", summary="Get local pageview index coverage and lookup counters")
+async def pageview_index_stats():
+    return pageview_index.get_stats()
+
+@wikipedia_router.get("/history/writer-stats", summary="Get search history write queue counters")
+async def history_writer_stats():
+    return history_writer.get_stats()
@@ -1,4 +1,5 @@
-from config.database import SessionLocal
+from contextlib import asynccontextmanager
+from config.database import SessionLocal, AsyncSessionLocal
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
@@ -8,3 +9,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def async_session_scope():
+    # For work that outlives the request dependency, e.g. streamed responses
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,5 +1,5 @@
 from functools import wraps
-from config.database import SessionLocal
+from config.database import SessionLocal, AsyncSessionLocal
 
 def with_db(func):
     @wraps(func)
@@ -11,3 +11,11 @@ def with_db(func):
         finally:
             db.close()
     return wrapper
+
+def with_async_db(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with AsyncSessionLocal() as db:
+            # Pass the async db session as a keyword argument
+            return await func(*args, db=db, **kwargs)
+    return wrapper
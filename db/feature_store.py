@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+from loguru import logger
+from sqlalchemy import select
+
+from config.database import AsyncSessionLocal
+from config.env import Env
+from db.rollups import UPSERT_INSERTS
+from models.article_features import ArticleFeatures
+from utils.metrics import DB_WRITE_DURATION, timed
+
+STRUCTURAL_FIELDS = ("article_length", "num_categories", "num_links", "touched")
+
+
+def normalize_title(title: str) -> str:
+    """Canonical store key: decoded, spaces not underscores, first letter upper-case
+    (MediaWiki treats the first letter of a title case-insensitively)."""
+    title = " ".join(unquote(title).replace("_", " ").split())
+    return (title[:1].upper() + title[1:])[:255]
+
+
+def _is_fresh(updated_at: Optional[datetime], ttl: float) -> bool:
+    if updated_at is None:
+        return False
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - updated_at < timedelta(seconds=ttl)
+
+
+def fresh_structural(record: Optional[ArticleFeatures]) -> Optional[dict]:
+    if record is None or not _is_fresh(record.structural_updated_at, Env.FEATURE_STRUCTURAL_TTL):
+        return None
+    return {field: getattr(record, field) for field in STRUCTURAL_FIELDS}
+
+
+def fresh_pageviews(record: Optional[ArticleFeatures]) -> Optional[list]:
+    if record is None or not _is_fresh(record.pageviews_updated_at, Env.FEATURE_PAGEVIEWS_TTL):
+        return None
+    return record.pageviews
+
+
+async def load_features(project: str, titles: List[str]) -> Dict[str, ArticleFeatures]:
+    """Stored records for the given titles of one wiki project, keyed by
+    normalized title.
+
+    Store errors are logged and treated as misses so lookups fall back to
+    the Wikipedia APIs.
+    """
+    keys = list({normalize_title(title) for title in titles})
+    if not keys:
+        return {}
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(ArticleFeatures).where(ArticleFeatures.project == project, ArticleFeatures.title.in_(keys))
+            )
+            return {record.title: record for record in rows.scalars()}
+    except Exception as e:
+        logger.warning(f"Feature store read failed: {e}")
+        return {}
+
+
+async def save_features(project: str, updates: List[dict]):
+    """Upsert refreshed feature groups for articles of one wiki project.
+
+    Each update has a `title` plus `structural` and/or `pageviews`; groups
+    that weren't refreshed are left untouched in the store.
+    """
+    now = datetime.now(timezone.utc)
+    rows_by_columns: Dict[tuple, List[dict]] = {}
+    for update in updates:
+        row = {"project": project, "title": normalize_title(update["title"])}
+        if update.get("structural") is not None:
+            row.update({field: update["structural"][field] for field in STRUCTURAL_FIELDS})
+            row["structural_updated_at"] = now
+        if update.get("pageviews") is not None:
+            row["pageviews"] = update["pageviews"]
+            row["pageviews_updated_at"] = now
+        if len(row) > 2:
+            rows_by_columns.setdefault(tuple(sorted(row)), []).append(row)
+
+    if not rows_by_columns:
+        return
+    try:
+        with timed(DB_WRITE_DURATION, "db", table="article_features"):
+            async with AsyncSessionLocal() as db:
+                insert = UPSERT_INSERTS[db.bind.dialect.name]
+                for columns, rows in rows_by_columns.items():
+                    # Duplicate titles in one statement would conflict with themselves
+                    rows = list({row["title"]: row for row in rows}.values())
+                    stmt = insert(ArticleFeatures).values(rows)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["project", "title"],
+                        set_={column: stmt.excluded[column] for column in columns if column not in ("project", "title")},
+                    )
+                    await db.execute(stmt)
+                await db.commit()
+    except Exception as e:
+        logger.warning(f"Feature store write failed: {e}")
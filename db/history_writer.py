@@ -0,0 +1,186 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy import String, insert
+
+from config.database import AsyncSessionLocal
+from config.env import Env
+from models.search import SearchHistory
+from db.rollups import apply_rollups
+from utils.metrics import DB_WRITE_DURATION, metrics, timed
+
+_STOP = object()
+
+# Length limits of the String columns, so one oversized field can't fail a whole batch
+_COLUMN_LIMITS = {
+    column.name: column.type.length
+    for column in SearchHistory.__table__.columns
+    if isinstance(column.type, String) and column.type.length
+}
+
+
+class HistoryWriter:
+    """Write-behind queue for SearchHistory rows.
+
+    Requests enqueue plain row dicts and return immediately; a background task
+    drains the bounded queue and writes rows with multi-row INSERTs. When the
+    queue is full, enqueue waits up to `enqueue_timeout` before dropping the
+    row, so a slow database can't pile up unbounded memory. Over-long
+    strings are truncated to their column, and a batch that keeps failing is
+    retried row by row so only the rows the database rejects are dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        max_size: int = Env.HISTORY_QUEUE_SIZE,
+        batch_size: int = Env.HISTORY_BATCH_SIZE,
+        flush_interval: float = Env.HISTORY_FLUSH_INTERVAL,
+        enqueue_timeout: float = Env.HISTORY_ENQUEUE_TIMEOUT,
+        max_retries: int = Env.HISTORY_MAX_RETRIES,
+    ):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.stats = {"enqueued": 0, "written": 0, "dropped": 0, "retried": 0, "batches": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued, then stop the writer."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def enqueue(self, row: dict) -> bool:
+        row.setdefault("timestamp", datetime.now(timezone.utc))
+        for name, limit in _COLUMN_LIMITS.items():
+            value = row.get(name)
+            if isinstance(value, str) and len(value) > limit:
+                row[name] = value[:limit]
+
+        if self._queue is None:
+            # Writer not running (e.g. startup hooks skipped): write inline
+            await self._write([row])
+            return True
+
+        try:
+            await asyncio.wait_for(self._queue.put(row), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["dropped"] += 1
+            logger.warning("Search history queue is full, dropping row")
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    async def enqueue_many(self, rows: List[dict]) -> int:
+        accepted = 0
+        for row in rows:
+            accepted += await self.enqueue(row)
+        return accepted
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+
+            # Collect more rows until the batch is full or the interval passes
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._write(batch)
+
+        # Drain whatever was queued behind the stop marker
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                remaining.append(item)
+        for i in range(0, len(remaining), self.batch_size):
+            await self._write(remaining[i:i + self.batch_size])
+
+    async def _insert(self, rows: List[dict]):
+        with timed(DB_WRITE_DURATION, table="search_history"):
+            async with self.session_factory() as db:
+                await db.execute(insert(SearchHistory), rows)
+                await apply_rollups(db, rows)
+                await db.commit()
+
+    async def _write(self, rows: List[dict]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._insert(rows)
+                self.stats["written"] += len(rows)
+                self.stats["batches"] += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    if len(rows) > 1:
+                        logger.warning(f"Search history batch failed after {attempt + 1} attempts ({e}), writing rows one by one")
+                        await self._write_each(rows)
+                        return
+                    self.stats["dropped"] += len(rows)
+                    logger.error(f"Dropping {len(rows)} search history rows after {attempt + 1} attempts: {e}")
+                    return
+                self.stats["retried"] += len(rows)
+                logger.warning(f"Search history write failed ({e}), retrying")
+                await asyncio.sleep(0.1 * (2 ** attempt))
+
+    async def _write_each(self, rows: List[dict]):
+        """Insert rows one at a time, dropping only the ones that fail."""
+        for row in rows:
+            try:
+                await self._insert([row])
+            except Exception as e:
+                self.stats["dropped"] += 1
+                logger.error(f"Dropping search history row for {row.get('search_query')!r}: {e}")
+                continue
+            self.stats["written"] += 1
+            self.stats["batches"] += 1
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "queued": self._queue.qsize() if self._queue is not None else 0}
+
+
+history_writer = HistoryWriter()
+
+HISTORY_ROWS = metrics.counter("history_rows_total", "Search history rows by outcome", ("outcome",))
+HISTORY_QUEUE_DEPTH = metrics.gauge("history_queue_depth", "Rows waiting in the write-behind queue")
+
+
+def _collect_history_metrics():
+    stats = history_writer.get_stats()
+    for outcome in ("enqueued", "written", "dropped", "retried"):
+        HISTORY_ROWS.set(stats[outcome], outcome=outcome)
+    HISTORY_QUEUE_DEPTH.set(stats["queued"])
+
+
+metrics.add_collector(_collect_history_metrics)
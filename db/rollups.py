@@ -0,0 +1,97 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.analytics import ArticleHourlyRollup, SearchHourlyRollup
+from utils.wiki_projects import DEFAULT_PROJECT, parse_wiki_url
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def region_key(region) -> str:
+    """Rollup key for a SearchHistory.region value (ipstack payload or placeholder string).
+
+    Must stay in sync with the SQL used to backfill rollups in the
+    analytics migration.
+    """
+    if isinstance(region, dict):
+        key = region.get("region_name") or region.get("country_name") or "unknown"
+    elif isinstance(region, str) and region:
+        key = region
+    else:
+        key = "unknown"
+    return key[:100]
+
+
+def project_key(row: dict) -> str:
+    """Wiki project code of the searched URL.
+
+    Must stay in sync with the SQL used to rebuild the article rollup in
+    the rollup project migration (the URL's first host label).
+    """
+    try:
+        project, _ = parse_wiki_url(row["search_query"])
+    except ValueError:
+        return DEFAULT_PROJECT
+    return project.code
+
+
+def article_key(row: dict) -> str:
+    data = row.get("wikipedia_data") or {}
+    return (data.get("title") or row["search_query"])[:255]
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+async def _upsert_counts(db: AsyncSession, model, rows: List[dict], keys: List[str], counters: List[str]):
+    insert = UPSERT_INSERTS[db.bind.dialect.name]
+    table = model.__table__
+    stmt = insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+    )
+    await db.execute(stmt)
+
+
+async def apply_rollups(db: AsyncSession, history_rows: List[dict]):
+    """Add a batch of new SearchHistory rows to the hourly rollup tables.
+
+    Runs in the caller's transaction so rollups and history commit together.
+    """
+    search_counts = Counter()
+    article_counts = Counter()
+    article_positive = Counter()
+    for row in history_rows:
+        bucket = hour_bucket(row["timestamp"])
+        search_counts[(bucket, region_key(row.get("region")), row["result"])] += 1
+        article = (bucket, project_key(row), article_key(row))
+        article_counts[article] += 1
+        if row["result"] == "positive":
+            article_positive[article] += 1
+
+    # Sorted so concurrent writers lock rows in the same order
+    await _upsert_counts(
+        db, SearchHourlyRollup,
+        [{"bucket": b, "region": r, "result": res, "searches": n} for (b, r, res), n in sorted(search_counts.items())],
+        ["bucket", "region", "result"], ["searches"],
+    )
+    await _upsert_counts(
+        db, ArticleHourlyRollup,
+        [
+            {"bucket": b, "project": p, "article": a, "searches": n, "positive": article_positive[(b, p, a)]}
+            for (b, p, a), n in sorted(article_counts.items())
+        ],
+        ["bucket", "project", "article"], ["searches", "positive"],
+    )
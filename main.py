@@ -1,9 +1,22 @@
-from fastapi import FastAPI
+import time
+APP_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from config.env import Env
-from controller import wikipedia_controller
+from controller import wikipedia_controller, analytics_controller
 from middleware.auth_middleware import CustomMiddleware
+from middleware.http_cache_middleware import HttpCacheMiddleware
+from utils.http_client import close_http_client
+from service.feed_scheduler import feed_scheduler
+from service.wikipedia_service import model_registry
+from db.history_writer import history_writer
+from utils.region_resolver import region_resolver
+from config.database import async_engine
+from utils.lazy_imports import import_report
+from utils.metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+from utils.log_sink import JsonLogSink, LogSampler, parse_sampling, register_sink_metrics
 
 
 app = FastAPI()
@@ -16,15 +29,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Structured JSON lines written, rotated and compressed off the request path
+log_sink = JsonLogSink()
+register_sink_metrics(log_sink)
 logger.add(
-    "logs/app.log",
-    rotation="30 MB",           # Rotate logs when they reach 30 MB
-    retention="30 days",        # Keep logs for 30 days
-    compression="zip",          # Compress old log files
+    log_sink,
     level="INFO",               # Minimum log level
-    format="{time} - {level} - {message}"  # Log format    
+    filter=LogSampler(parse_sampling(Env.LOG_SAMPLING)),
 )
 
+# Compression, ETags and Cache-Control; inside CustomMiddleware so 304s are still timed and tagged
+app.add_middleware(HttpCacheMiddleware)
 app.add_middleware(CustomMiddleware)
 
 
@@ -32,17 +47,41 @@ app.add_middleware(CustomMiddleware)
 @app.get("/api")
 def read_root():
     database_url = Env.DATABASE_URL
-    logger.info("API was accessed.")
+    logger.debug("API was accessed.")
     return {"message": "Welcome to the API"}
 
 
+# Import cost of the app itself; heavy dependencies are loaded later, on demand
+APP_IMPORT_SECONDS = time.perf_counter() - APP_IMPORT_STARTED
+
+
+@app.get("/api/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/api/startup-profile")
+def startup_profile():
+    return import_report(APP_IMPORT_SECONDS)
+
+
 app.include_router(wikipedia_controller.wikipedia_router, prefix="/api/wikipedia", tags=["wiki"])
+app.include_router(analytics_controller.analytics_router, prefix="/api/analytics", tags=["analytics"])
 
 
 @app.on_event("startup")
 async def startup_event():
-    print("App is starting.")
+    logger.info("App is starting.")
+    await model_registry.start()
+    feed_scheduler.start()
+    history_writer.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    print("App is shutting down.")
+    logger.info("App is shutting down.")
+    await feed_scheduler.stop()
+    await region_resolver.stop()
+    await history_writer.stop()
+    await async_engine.dispose()
+    await close_http_client()
+    log_sink.stop()
@@ -1,38 +1,107 @@
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from loguru import logger
+import itertools
+import os
+import random
+import secrets
 import time
-import uuid
-
-
-class CustomMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Restrict middleware processing to specific routes
-        if not (request.url.path.startswith("/api") or request.url.path.startswith("/docs") or request.url.path.startswith("/openapi.json")):
-            return JSONResponse(
-                status_code=404,
-                content={"message": "ACCESS DENIED"}
-            )
-
-        # Generate a unique request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id  # Attach it to the request state
-
-        # Add request ID to the logger's context
-        with logger.contextualize(request_id=request_id):
-            # Log the incoming request details
-            logger.info(f"Incoming request: {request.method} {request.url} | Client: {request.client.host}")
-            start_time = time.time()
-
-            # Process the request
-            response = await call_next(request)
-
-            # Log the response details
-            process_time = time.time() - start_time
-            logger.info(
-                f"Completed request: {request.method} {request.url} | "
-                f"Status: {response.status_code} | Time: {process_time:.2f}s"
-            )
-
-        return response
\ No newline at end of file
+from typing import Optional
+
+from fastapi import Header, HTTPException
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+
+from config.env import Env
+from utils.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT, start_request_timings, server_timing_header
+
+# Paths served by the app; everything else is rejected before routing
+ALLOWED_PREFIXES = ("/api", "/docs", "/openapi.json")
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+# Generated IDs: a random per-process prefix plus a counter, cheaper than uuid4
+_id_prefix = os.urandom(4).hex()
+_id_counter = itertools.count(1)
+
+_access_denied = JSONResponse(status_code=404, content={"message": "ACCESS DENIED"})
+
+
+def _request_id(headers) -> str:
+    """Reuse the caller's X-Request-ID when it's sane, otherwise make one."""
+    for name, value in headers:
+        if name == REQUEST_ID_HEADER:
+            if 0 < len(value) <= MAX_REQUEST_ID_LENGTH and value.isascii() and value.decode().isprintable():
+                return value.decode()
+            break
+    return f"{_id_prefix}-{next(_id_counter)}"
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Dependency for admin endpoints: the caller must send ADMIN_TOKEN as
+    X-Admin-Token. Fails closed when no token is configured."""
+    if not Env.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode(), Env.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def _route_label(scope) -> str:
+    # Route template rather than raw path, to keep the series count bounded
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+def _should_log(status: int, elapsed: float) -> bool:
+    # Errors and slow requests are always logged, the rest is sampled
+    return status >= 500 or elapsed >= Env.LOG_SLOW_REQUEST or random.random() < Env.LOG_SAMPLE_RATE
+
+
+class CustomMiddleware:
+    """Path gating, request IDs, timing and metrics as a plain ASGI middleware.
+
+    Only the `http.response.start` message is touched (to add headers), so
+    streamed bodies pass straight through without being buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if not path.startswith(ALLOWED_PREFIXES):
+            await _access_denied(scope, receive, send)
+            return
+
+        request_id = _request_id(scope["headers"])
+        scope.setdefault("state", {})["request_id"] = request_id  # request.state.request_id
+        timings = start_request_timings()
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                if Env.SERVER_TIMING:
+                    headers.append("Server-Timing", server_timing_header(timings, time.perf_counter() - started))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            with logger.contextualize(request_id=request_id):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            elapsed = time.perf_counter() - started
+            REQUEST_DURATION.observe(elapsed, method=scope["method"], route=_route_label(scope), status=status)
+            if _should_log(status, elapsed):
+                logger.info(
+                    "Completed request: {} {} | Status: {} | Time: {:.3f}s | Client: {} | ID: {}",
+                    scope["method"], path, status, elapsed, scope["client"][0] if scope.get("client") else "-", request_id,
+                )
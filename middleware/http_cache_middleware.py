@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config.env import Env
+
+try:
+    import brotli  # optional, preferred over gzip when installed
+except ImportError:
+    brotli = None
+
+# Bodies compressed off the event loop from this size on
+THREAD_COMPRESSION_SIZE = 128 * 1024
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Controllers report failures as a 200 with an error payload; never cache those
+ERROR_PREFIXES = (b'{"error"', b'"Error')
+
+
+def _accepted_encoding(headers: Headers):
+    accepted = {
+        part.split(";", 1)[0].strip().lower()
+        for part in headers.get("accept-encoding", "").split(",")
+        if not part.strip().endswith(";q=0")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=min(level, 11))
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def _etag(body: bytes) -> str:
+    # Weak: the same entity may go out gzipped, brotli'd or plain
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:]
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class HttpCacheMiddleware:
+    """Compression, ETags and Cache-Control as a plain ASGI middleware.
+
+    Complete bodies of at least `min_size` bytes are compressed (brotli
+    when the client accepts it and the package is installed, gzip
+    otherwise). GET responses on the paths in `max_ages` also get a content
+    hash ETag and a public Cache-Control, and a matching If-None-Match gets
+    an empty 304. The ETag hashes the body, so only endpoints that give
+    the same URL the same body belong in `max_ages`. Streamed bodies pass
+    straight through untouched, so NDJSON records still reach the client
+    as they are produced.
+    """
+
+    def __init__(
+        self,
+        app,
+        min_size: int = Env.COMPRESSION_MIN_SIZE,
+        level: int = Env.COMPRESSION_LEVEL,
+        max_ages: dict = Env.HTTP_CACHE_MAX_AGE,
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.max_ages = max_ages
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = _accepted_encoding(request_headers)
+        max_age = self.max_ages.get(scope["path"]) if scope["method"] in ("GET", "HEAD") else None
+        if encoding is None and max_age is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message  # held until we know whether the body is complete
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if message.get("more_body", False):
+                # Streaming response: send it as produced
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            await self._send_complete(start, message.get("body", b""), request_headers, encoding, max_age, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_complete(self, start, body: bytes, request_headers: Headers, encoding, max_age, send):
+        headers = MutableHeaders(scope=start)
+
+        if max_age is not None and start["status"] == 200 and body and not body.startswith(ERROR_PREFIXES):
+            etag = _etag(body)
+            headers["ETag"] = etag
+            headers["Cache-Control"] = f"public, max-age={max_age}"
+            headers.add_vary_header("Accept-Encoding")
+            if_none_match = request_headers.get("if-none-match")
+            if if_none_match and _etag_matches(if_none_match, etag):
+                not_modified = MutableHeaders(
+                    {name: headers[name] for name in ("ETag", "Cache-Control", "Vary") if name in headers}
+                )
+                await send({"type": "http.response.start", "status": 304, "headers": not_modified.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if (
+            encoding is not None
+            and len(body) >= self.min_size
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+        ):
+            if len(body) >= THREAD_COMPRESSION_SIZE:
+                body = await asyncio.to_thread(_compress, body, encoding, self.level)
+            else:
+                body = _compress(body, encoding, self.level)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
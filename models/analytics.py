@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from config.database import Base  # Import Base from your project
+
+
+class SearchHourlyRollup(Base):
+    """Searches per hour, region and result; kept up to date by the history writer."""
+    __tablename__ = 'search_hourly_rollup'
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    region = Column(String(100), primary_key=True)
+    result = Column(String(20), primary_key=True)
+    searches = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SearchHourlyRollup(bucket={self.bucket}, region={self.region}, result={self.result}, searches={self.searches})>"
+
+
+class ArticleHourlyRollup(Base):
+    """Searches per hour, wiki project and article title; kept up to date by the history writer."""
+    __tablename__ = 'article_hourly_rollup'
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    project = Column(String(32), primary_key=True, default="en", server_default="en")  # wiki language code
+    article = Column(String(255), primary_key=True)
+    searches = Column(Integer, nullable=False, default=0)
+    positive = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ArticleHourlyRollup(bucket={self.bucket}, project={self.project}, article={self.article}, searches={self.searches})>"
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from config.database import Base  # Import Base from your project
+
+
+class ArticleFeatures(Base):
+    """Last fetched model features per article and wiki project, split into
+    groups that go stale at different rates (see db/feature_store.py)."""
+    __tablename__ = 'article_features'
+
+    project = Column(String(32), primary_key=True, default="en", server_default="en")  # wiki language code
+    title = Column(String(255), primary_key=True)  # normalized article title
+
+    # Structural group: from the MediaWiki query API
+    article_length = Column(Integer, nullable=True)
+    num_categories = Column(Integer, nullable=True)
+    num_links = Column(Integer, nullable=True)
+    touched = Column(String(20), nullable=True)  # API timestamp, e.g. 2025-01-01T00:00:00Z
+    structural_updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Pageview group: daily views from the REST pageviews API
+    pageviews = Column(JSON, nullable=True)
+    pageviews_updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ArticleFeatures(project={self.project}, title={self.title}, structural_updated_at={self.structural_updated_at}, pageviews_updated_at={self.pageviews_updated_at})>"
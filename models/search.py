@@ -8,13 +8,24 @@ class SearchHistory(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     ip_address = Column(String(50), nullable=False)
-    search_query = Column(String(255), nullable=False)
+    search_query = Column(String(255), nullable=False, index=True)
     wikipedia_data = Column(JSON, nullable=True)
-    result = Column(Text, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    result = Column(Text, nullable=False, index=True)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     user_agent = Column(String(255), nullable=True)
     region = Column(JSON, nullable=True)
 
     def __repr__(self):
         return f"<SearchHistory(id={self.id}, ip_address={self.ip_address}, search_query={self.search_query}, timestamp={self.timestamp})>"
 
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "ip_address": self.ip_address,
+            "search_query": self.search_query,
+            "wikipedia_data": self.wikipedia_data,
+            "result": self.result,
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "user_agent": self.user_agent,
+            "region": self.region,
+        }
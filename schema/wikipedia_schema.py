@@ -1,5 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List
+from config.env import Env
 
 class SearchModel(BaseModel):
-    search: str
\ No newline at end of file
+    search: str
+
+class BatchSearchModel(BaseModel):
+    searches: List[str] = Field(..., min_length=1, max_length=Env.BATCH_MAX_URLS)
\ No newline at end of file
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.rollups import hour_bucket
+from models.analytics import ArticleHourlyRollup, SearchHourlyRollup
+
+
+def get_window(start: Optional[datetime], end: Optional[datetime], hours: int):
+    """Resolve an analytics time window to whole-hour rollup buckets."""
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=hours)
+    return hour_bucket(start), hour_bucket(end)
+
+
+async def top_searched_articles(db: AsyncSession, start: datetime, end: datetime, limit: int = 10, project: Optional[str] = None):
+    searches = func.sum(ArticleHourlyRollup.searches).label("searches")
+    positive = func.sum(ArticleHourlyRollup.positive).label("positive")
+    query = (
+        select(ArticleHourlyRollup.project, ArticleHourlyRollup.article, searches, positive)
+        .where(ArticleHourlyRollup.bucket >= start, ArticleHourlyRollup.bucket <= end)
+        .group_by(ArticleHourlyRollup.project, ArticleHourlyRollup.article)
+        .order_by(searches.desc())
+        .limit(limit)
+    )
+    if project is not None:
+        query = query.where(ArticleHourlyRollup.project == project)
+    rows = (await db.execute(query)).all()
+    return [
+        {
+            "project": row.project,
+            "article": row.article,
+            "searches": row.searches,
+            "positive": row.positive,
+            "negative": row.searches - row.positive,
+        }
+        for row in rows
+    ]
+
+
+async def result_ratio_over_time(db: AsyncSession, start: datetime, end: datetime):
+    query = (
+        select(SearchHourlyRollup.bucket, SearchHourlyRollup.result, func.sum(SearchHourlyRollup.searches))
+        .where(SearchHourlyRollup.bucket >= start, SearchHourlyRollup.bucket <= end)
+        .group_by(SearchHourlyRollup.bucket, SearchHourlyRollup.result)
+        .order_by(SearchHourlyRollup.bucket)
+    )
+    buckets = {}
+    for bucket, result, searches in (await db.execute(query)).all():
+        counts = buckets.setdefault(bucket, {"positive": 0, "negative": 0})
+        counts[result] = counts.get(result, 0) + searches
+
+    series = []
+    for bucket, counts in buckets.items():
+        total = counts["positive"] + counts["negative"]
+        series.append({
+            "hour": bucket.isoformat(),
+            "positive": counts["positive"],
+            "negative": counts["negative"],
+            "positive_ratio": round(counts["positive"] / total, 4) if total else None
+        })
+    return series
+
+
+async def searches_per_region(db: AsyncSession, start: datetime, end: datetime, region: Optional[str] = None):
+    searches = func.sum(SearchHourlyRollup.searches)
+    query = (
+        select(SearchHourlyRollup.bucket, SearchHourlyRollup.region, searches)
+        .where(SearchHourlyRollup.bucket >= start, SearchHourlyRollup.bucket <= end)
+        .group_by(SearchHourlyRollup.bucket, SearchHourlyRollup.region)
+        .order_by(SearchHourlyRollup.bucket, searches.desc())
+    )
+    if region is not None:
+        query = query.where(SearchHourlyRollup.region == region)
+    return [
+        {"hour": bucket.isoformat(), "region": region_name, "searches": count}
+        for bucket, region_name, count in (await db.execute(query)).all()
+    ]
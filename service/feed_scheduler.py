@@ -0,0 +1,166 @@
+import asyncio
+import time
+from datetime import timedelta
+from datetime import datetime as dt
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import pytz
+from loguru import logger
+
+from config.env import Env
+from service.wikipedia_service import (
+    build_index_trending,
+    build_top_trending,
+    fetch_on_this_day_pool,
+    fetch_top_pageviews,
+    get_local_month_day,
+    get_on_this_day_data,
+    get_top_trending_articles,
+    get_yesterdays_date,
+    sample_on_this_day,
+)
+from utils.wiki_projects import get_project
+
+# Don't hammer upstream when stale requests keep asking for a revalidation
+MIN_REVALIDATE_INTERVAL = 60
+
+
+class FeedScheduler:
+    """Keeps the daily trending and on-this-day payloads precomputed in memory.
+
+    A background loop refreshes them every `interval` seconds and again just
+    before each UTC day rollover, fetching the on-this-day feed for both today
+    and tomorrow in every served timezone so the switch-over needs no upstream
+    I/O. If a refresh fails the previous payload keeps being served and a new
+    refresh is scheduled (stale-while-revalidate).
+
+    Payloads are kept per wiki project. `projects` are refreshed from the
+    start; any other project is added the first time it's requested.
+    """
+
+    def __init__(self, projects: List[str], timezones: List[str], interval: float, lead: float):
+        self.projects = set(projects)
+        self.timezones = timezones
+        self.interval = interval
+        self.lead = lead
+        self.trending_date: Dict[str, str] = {}
+        self.trending: Dict[str, list] = {}
+        self.on_this_day: Dict[Tuple[str, str, str], list] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._revalidation: Optional[asyncio.Task] = None
+        self._last_refresh = 0.0
+
+    def target_days(self) -> set:
+        """(month, day) pairs that are today or tomorrow in some served timezone."""
+        days = set()
+        for name in self.timezones:
+            local_now = dt.now(pytz.timezone(name))
+            for offset in (0, 1):
+                date = local_now + timedelta(days=offset)
+                days.add((f"{date.month:02d}", f"{date.day:02d}"))
+        return days
+
+    async def refresh(self):
+        self._last_refresh = time.monotonic()
+        targets = self.target_days()
+        # Projects refresh concurrently, each on its own pool and rate budget
+        await asyncio.gather(*(self.refresh_project(project, targets) for project in sorted(self.projects)))
+
+        # Drop feeds for days no timezone is on any more
+        for key in list(self.on_this_day):
+            if key[1:] not in targets:
+                del self.on_this_day[key]
+
+    async def refresh_project(self, project: str, targets: set):
+        for month, day in targets:
+            try:
+                self.on_this_day[(project, month, day)] = await fetch_on_this_day_pool(project, month, day)
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to prefetch {project} on-this-day feed for {month}/{day}: {e}")
+
+        # The top list for a day is only published after it ends, so this
+        # can't be fetched ahead; until it appears the previous list is kept.
+        date = get_yesterdays_date()
+        if date != self.trending_date.get(project):
+            trending = await asyncio.to_thread(build_index_trending, project)
+            if trending is not None:
+                self.trending[project] = trending
+                self.trending_date[project] = date
+                return
+            try:
+                data = await fetch_top_pageviews(project, date)
+                self.trending[project] = build_top_trending(data, project)
+                self.trending_date[project] = date
+            except (httpx.HTTPError, IndexError, KeyError) as e:
+                logger.warning(f"Failed to refresh {project} top trending for {date}: {e}")
+
+    def _seconds_until_next_run(self) -> float:
+        now = dt.now(pytz.utc)
+        next_rollover = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        until_prefetch = (next_rollover - now).total_seconds() - self.lead
+        if until_prefetch <= 0:
+            return self.interval
+        return min(self.interval, until_prefetch)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Feed refresh failed: {e}")
+            await asyncio.sleep(self._seconds_until_next_run())
+
+    def _revalidate(self):
+        if self._revalidation is not None and not self._revalidation.done():
+            return
+        if time.monotonic() - self._last_refresh < MIN_REVALIDATE_INTERVAL:
+            return
+        self._revalidation = asyncio.create_task(self.refresh())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._revalidation):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._revalidation = None
+
+    async def get_top_trending(self, project: Optional[str] = None):
+        project = get_project(project).code
+        self.projects.add(project)
+        trending = self.trending.get(project)
+        if trending is not None:
+            if self.trending_date[project] != get_yesterdays_date():
+                self._revalidate()  # serve stale, refresh in the background
+            return trending
+        # Nothing precomputed yet (cold start, new project or scheduler not running)
+        if self.trending:
+            self._revalidate()
+        return await get_top_trending_articles(project)
+
+    async def get_on_this_day(self, timezone="UTC", project: Optional[str] = None, seed: Optional[int] = None):
+        project = get_project(project).code
+        self.projects.add(project)
+        month, day = get_local_month_day(timezone)
+        pool = self.on_this_day.get((project, month, day))
+        if pool is None:
+            if self.on_this_day:
+                self._revalidate()
+            return await get_on_this_day_data(timezone, project, seed)
+        return sample_on_this_day(pool, seed=seed)
+
+
+feed_scheduler = FeedScheduler(
+    projects=Env.FEED_PROJECTS,
+    timezones=Env.FEED_TIMEZONES,
+    interval=Env.FEED_REFRESH_INTERVAL,
+    lead=Env.FEED_PREFETCH_LEAD,
+)
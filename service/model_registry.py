@@ -0,0 +1,211 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from loguru import logger
+
+from config.env import Env
+from utils.lazy_imports import LazyModule, warm_imports
+from utils.metrics import MODEL_BATCH_SIZE, MODEL_INFERENCE_DURATION, timed
+
+# Imported on first load/predict so cold starts that never predict skip them
+joblib = LazyModule("joblib")
+np = LazyModule("numpy")
+
+
+class MicroBatcher:
+    """Coalesces single-row predictions into one vectorized model call.
+
+    The first row to arrive opens a window of `window` seconds; every row
+    submitted before it closes (or until `max_batch` rows are waiting) goes
+    through the same `predict`/`predict_proba` call.
+    """
+
+    def __init__(self, registry: "ModelRegistry", version: str, method: str, window: float, max_batch: int):
+        self.registry = registry
+        self.version = version
+        self.method = method
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = {"rows": 0, "batches": 0, "largest_batch": 0}
+        self._rows: List[list] = []
+        self._futures: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, row: list):
+        future = asyncio.get_running_loop().create_future()
+        self._rows.append(row)
+        self._futures.append(future)
+        if len(self._rows) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, futures = self._rows, self._futures
+        self._rows, self._futures = [], []
+        if not rows:
+            return
+
+        self.stats["rows"] += len(rows)
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(rows))
+        # Predict off the event loop; keep a reference so the task isn't collected
+        task = asyncio.ensure_future(self._predict(rows, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _predict(self, rows: List[list], futures: List[asyncio.Future]):
+        try:
+            # Resolved per batch, so a hot swap applies from the next batch on
+            outputs = await asyncio.to_thread(self.registry.predict, rows, self.version, self.method)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, output in zip(futures, outputs):
+            if not future.done():
+                future.set_result(output)
+
+
+class ModelRegistry:
+    """Named model versions, loaded lazily or on startup and swapped atomically.
+
+    `versions` maps a version name to its joblib artifact. A reload reads the
+    artifact into a new object and replaces the registry entry in one
+    assignment: in-flight batches finish on the model they started with and
+    the next batch picks up the new one.
+    """
+
+    def __init__(
+        self,
+        versions: Dict[str, str],
+        default: str,
+        expected_features: Optional[int] = None,
+        batch_window: float = Env.MODEL_BATCH_WINDOW,
+        max_batch: int = Env.MODEL_MAX_BATCH,
+    ):
+        self.versions = versions
+        self.default = default
+        self.expected_features = expected_features
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._models: Dict[str, Any] = {}
+        self._loaded_mtime: Dict[str, float] = {}
+        self._load_lock = threading.Lock()
+        self._batchers: Dict[tuple, MicroBatcher] = {}
+        self._warmup: Optional[asyncio.Task] = None
+
+    def _resolve(self, version: Optional[str]) -> str:
+        version = version or self.default
+        if version not in self.versions:
+            raise KeyError(f"Unknown model version '{version}'")
+        return version
+
+    def _read(self, version: str):
+        path = self.versions[version]
+        mtime = os.path.getmtime(path)
+        model = joblib.load(path)
+        if not hasattr(model, "predict"):
+            raise ValueError(f"{path} does not contain a model with predict()")
+        n_features = getattr(model, "n_features_in_", None)
+        if self.expected_features is not None and n_features not in (None, self.expected_features):
+            raise ValueError(f"{path} expects {n_features} features, not {self.expected_features}")
+        return model, mtime
+
+    def load(self, version: Optional[str] = None, force: bool = False):
+        """Load (or with `force`, re-read) a version and return the model."""
+        version = self._resolve(version)
+        with self._load_lock:
+            if version in self._models and not force:
+                return self._models[version]
+            model, mtime = self._read(version)
+            self._models[version] = model  # atomic swap
+            self._loaded_mtime[version] = mtime
+        logger.info(f"Loaded model '{version}' from {self.versions[version]}")
+        return model
+
+    async def get(self, version: Optional[str] = None):
+        """Model for a version, loading it off the event loop on first use.
+        Returns None if it can't be loaded."""
+        version = self._resolve(version)
+        model = self._models.get(version)
+        if model is not None:
+            return model
+        try:
+            return await asyncio.to_thread(self.load, version)
+        except Exception as e:
+            logger.error(f"Failed to load model '{version}': {e}")
+            return None
+
+    def get_loaded(self, version: Optional[str] = None):
+        version = self._resolve(version)
+        model = self._models.get(version)
+        if model is None:
+            raise RuntimeError(f"Model '{version}' is not loaded")
+        return model
+
+    async def reload(self, version: Optional[str] = None):
+        """Re-read a version's artifact from disk and swap it in. The current
+        model stays in service if the new artifact fails to load."""
+        version = self._resolve(version)
+        await asyncio.to_thread(self.load, version, True)
+        return self.describe(version)
+
+    async def start(self, mode: str = Env.STARTUP_MODE):
+        """Prepare the default version according to the startup mode:
+        "eager" loads it before serving, "background" imports the heavy
+        dependencies and loads it in a worker thread while requests are
+        already being served, "lazy" waits for the first prediction."""
+        if mode == "eager":
+            await self.get()
+        elif mode == "background" and self._warmup is None:
+            self._warmup = asyncio.create_task(self._warm())
+
+    async def _warm(self):
+        started = time.perf_counter()
+        await asyncio.to_thread(warm_imports)
+        if await self.get() is not None:
+            logger.info(f"Model warm-up finished in {time.perf_counter() - started:.2f}s")
+
+    async def predict_one(self, row: list, version: Optional[str] = None, method: str = "predict"):
+        """Predict a single feature row, batched with concurrent callers."""
+        version = self._resolve(version)
+        key = (version, method)
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            batcher = self._batchers[key] = MicroBatcher(self, version, method, self.batch_window, self.max_batch)
+        return await batcher.submit(row)
+
+    def predict(self, rows: List[list], version: Optional[str] = None, method: str = "predict"):
+        """Predict many rows in one call with an already loaded model."""
+        version = self._resolve(version)
+        model = self.get_loaded(version)
+        MODEL_BATCH_SIZE.observe(len(rows), version=version)
+        with timed(MODEL_INFERENCE_DURATION, "model", version=version, method=method):
+            return getattr(model, method)(np.array(rows))
+
+    def describe(self, version: str) -> dict:
+        model = self._models.get(version)
+        return {
+            "version": version,
+            "path": self.versions[version],
+            "loaded": model is not None,
+            "default": version == self.default,
+            "model": type(model).__name__ if model is not None else None,
+            "artifact_mtime": self._loaded_mtime.get(version),
+        }
+
+    def get_stats(self) -> dict:
+        return {
+            "models": [self.describe(version) for version in self.versions],
+            "batching": {f"{version}:{method}": batcher.stats for (version, method), batcher in self._batchers.items()},
+        }
@@ -1,100 +1,105 @@
-import requests
-from sqlalchemy.orm import Session
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
-from typing import Optional
+from typing import List, Optional
 from models.search import SearchHistory
 from datetime import timedelta
 from datetime import datetime as dt
 from config.env import Env
-from utils.wikipedia_helper import get_region_from_ip, get_wikipedia_features, extract_article_title, get_past_week_views, predict_future_views
-import joblib
-import numpy as np
+from db.history_writer import history_writer
+from utils.wikipedia_helper import get_wikipedia_features, get_wikipedia_features_batch, extract_article_title, get_past_week_views, predict_future_views, MAX_TITLES_PER_QUERY
+from utils.wiki_projects import DEFAULT_PROJECT, get_project, parse_wiki_url
+from utils.http_client import get_http_client, USER_AGENT
+from utils.cache import cached
+from utils.forecast import FORECAST_MODELS
+from utils.region_resolver import region_resolver
+from utils.pageview_index import pageview_index
+from utils.trending import trending_engines
+from service.model_registry import ModelRegistry
+import asyncio
+import html
 import random
+import re
 import pytz
 
+DEFAULT_HEADERS = {"User-Agent": USER_AGENT}
 
-# Global model variable
-loaded_sklearn_model = None
+# Rows pulled from the DB per round-trip when exporting history
+HISTORY_EXPORT_BATCH_SIZE = 1000
 
-def load_sklearn_model_once():
-    global loaded_sklearn_model
-    try:
-        # Load your scikit-learn model (adjust path as needed)
-        loaded_sklearn_model = joblib.load("service/logistic_regression_model.pkl")
-        print("✅ scikit-learn model loaded successfully")
-    except Exception as e:
-        print(f"❌ Failed to load scikit-learn model: {e}")
-        loaded_sklearn_model = None
+# On-this-day events per response, each from a different year
+ON_THIS_DAY_EVENTS = 5
 
-# Load the scikit-learn model at startup
-load_sklearn_model_once()
+HTML_TAG = re.compile(r"<[^>]+>")
 
-def preprocess_input(data: dict):
+FEATURE_KEYS = ["title_length", "article_length", "num_categories", "num_links", "zero_pageviews_days", "recent_edit_days", "pageview_trend"]
+
+def feature_row(data: dict):
     # Ensure all necessary keys are present
-    required_keys = ["title_length", "article_length", "num_categories", "num_links", "zero_pageviews_days", "recent_edit_days", "pageview_trend"]
-    if not all(key in data for key in required_keys):
-        raise ValueError(f"Missing one of the required keys: {required_keys}")
+    if not all(key in data for key in FEATURE_KEYS):
+        raise ValueError(f"Missing one of the required keys: {FEATURE_KEYS}")
+    return [data[key] for key in FEATURE_KEYS]
+
+# Model versions are loaded on startup (or on first use) rather than at import
+model_registry = ModelRegistry(Env.MODEL_VERSIONS, Env.MODEL_DEFAULT_VERSION, expected_features=len(FEATURE_KEYS))
+
+def preprocess_input(data: dict):
+    features = feature_row(data)
     
-    features = [
-        data["title_length"],
-        data["article_length"],
-        data["num_categories"],
-        data["num_links"],
-        data["zero_pageviews_days"],
-        data["recent_edit_days"],
-        data["pageview_trend"],
-    ]
+    logger.debug("Preprocessed input: {}", features)
+    return features
+
+def validate_search_url(search: str) -> Optional[str]:
+    """Return an error message if `search` isn't an accepted Wikipedia URL."""
+    if not search:
+        return "Search query cannot be empty"
     
-    print(f"Preprocessed input: {features}")
-    return np.array([features])
+    try:
+        parse_wiki_url(search)
+    except ValueError as e:
+        return str(e)
+    return None
 
-def search_in_model_service(search: str, db: Session, ip_address: str, user_agent: Optional[str]):
-    global loaded_sklearn_model
+async def search_in_model_service(search: str, ip_address: str, user_agent: Optional[str]):
     logger.info(f"Received search query: '{search}' from IP: {ip_address} using User-Agent: {user_agent}")
     
-    if not search:
-        return {"error": "Search query cannot be empty"}
-    
-    if not search.startswith("https://en.wikipedia.org/wiki/") and not search.startswith("https://en.m.wikipedia.org/wiki/")  and not search.startswith("en.wikipedia.org/wiki/") and not search.startswith("en.m.wikipedia.org/wiki/"):
-        return {"error": "Search query must be a valid Wikipedia URL"}
+    error = validate_search_url(search)
+    if error:
+        return {"error": error}
     
     # Check if the model is loaded
-    if not loaded_sklearn_model:
+    if not await model_registry.get():
         return {"error": "Model is not loaded. Please check the model path and ensure it is properly trained."}
 
     try:
         # Fetch Wikipedia data (you need to implement get_wikipedia_features)
-        data = get_wikipedia_features(search)
+        data = await get_wikipedia_features(search)
         if data["article_length"] == 0:
             return {"error": "No data found for the given URL. Please try another Wikipedia article."}
         input_data = preprocess_input(data)
         
-        # Predict using the scikit-learn model
-        prediction = loaded_sklearn_model.predict(input_data)[0]
+        # Predict using the scikit-learn model, batched with concurrent searches
+        prediction = await model_registry.predict_one(input_data)
         
         # Interpret prediction (Adjust threshold if necessary)
         search_result = "positive" if prediction == 1 else "negative"
-        print(f"Prediction: {prediction} => {search_result}")
+        logger.debug("Prediction: {} => {}", prediction, search_result)
         
         # Optional: Get region from IP address if needed
-        ip = Env.ALLOW_IP or "No"
-        region_data = get_region_from_ip(ip_address) if ip == "Yes" else "DUMMY REGION"
-        
-        # Log search history in DB
-        search_history = SearchHistory(
-            ip_address=ip_address,
-            search_query=search,
-            result=search_result,
-            user_agent=user_agent,
-            region=region_data,
-            wikipedia_data=data
-        )
+        region_data = get_region(ip_address)
         
-        db.add(search_history)
-        db.commit()
-        db.refresh(search_history)
+        # Log search history in DB (written in the background)
+        await queue_history([{
+            "ip_address": ip_address,
+            "search_query": search,
+            "result": search_result,
+            "user_agent": user_agent,
+            "region": region_data,
+            "wikipedia_data": data
+        }], ip_address)
         
-        logger.info(f"Search result stored for query '{search}' from IP: {ip_address}")
+        logger.debug("Search result queued for query '{}' from IP: {}", search, ip_address)
         
         return {
             "search_results": search_result,
@@ -105,164 +110,358 @@ def search_in_model_service(search: str, db: Session, ip_address: str, user_agen
         }
     except Exception as e:
         logger.error(f"Error occurred while processing search '{search}': {e}")
-        db.rollback()
         return {"error": f"Failed to perform search: {e}"}
 
-  
 
-def get_on_this_day_data(timezone="UTC"):
-    try:
-        # Get the current date based on the user's timezone
-        tz = pytz.timezone(timezone)
-        date = dt.now(tz)
-        
-        # Extract the month and day
-        formatted_month = f"{date.month:02d}"
-        formatted_day = f"{date.day:02d}"
-        headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
+async def classify_searches(searches: List[str], offset: int, ip_address: str, user_agent: Optional[str], region_data):
+    """Validate, fetch features for, classify and store a list of searches.
+
+    Features come from grouped multi-title queries, all valid rows go
+    through a single vectorized predict, and history rows are queued for the
+    background writer.
+    Returns one result per search, tagged with its index in the request.
+    """
+    results = [{"index": offset + i, "search": search} for i, search in enumerate(searches)]
+    pending = []
+    for i, search in enumerate(searches):
+        error = validate_search_url(search)
+        if error:
+            results[i]["error"] = error
+        else:
+            pending.append(i)
+
+    features = await get_wikipedia_features_batch([searches[i] for i in pending])
+
+    rows = []
+    row_indexes = []
+    for i, data in zip(pending, features):
+        if isinstance(data, Exception):
+            results[i]["error"] = f"Failed to perform search: {data}"
+        elif data["article_length"] == 0:
+            results[i]["error"] = "No data found for the given URL. Please try another Wikipedia article."
+        else:
+            try:
+                rows.append(feature_row(data))
+                row_indexes.append(i)
+                results[i]["data"] = data
+            except ValueError as e:
+                results[i]["error"] = f"Failed to perform search: {e}"
+
+    if rows:
+        predictions = await asyncio.to_thread(model_registry.predict, rows)
+        history_rows = []
+        for i, prediction in zip(row_indexes, predictions):
+            search_result = "positive" if prediction == 1 else "negative"
+            results[i]["search_results"] = search_result
+            history_rows.append({
+                "ip_address": ip_address,
+                "search_query": searches[i],
+                "result": search_result,
+                "user_agent": user_agent,
+                "region": region_data,
+                "wikipedia_data": results[i]["data"],
+            })
+
+        await queue_history(history_rows, ip_address)
+
+    return results
+
+def get_region(ip_address: str):
+    """Region for the client, without waiting on the network.
+
+    Returns None when the address isn't in the local cache or GeoIP database
+    yet; queue_history then fills it in once the remote lookup finishes.
+    """
+    ip = Env.ALLOW_IP or "No"
+    return region_resolver.lookup_local(ip_address) if ip == "Yes" else "DUMMY REGION"
+
+async def queue_history(rows: List[dict], ip_address: str):
+    """Hand history rows to the background writer.
+
+    Rows without a region are held back until the address has been resolved
+    remotely, which happens after the response has been sent.
+    """
+    now = dt.now(pytz.utc)
+    for row in rows:
+        row.setdefault("timestamp", now)
+
+    if (Env.ALLOW_IP or "No") != "Yes" or any(row["region"] is not None for row in rows):
+        await history_writer.enqueue_many(rows)
+        return
+
+    async def fill_region(region):
+        for row in rows:
+            row["region"] = region
+        await history_writer.enqueue_many(rows)
+
+    region_resolver.resolve_later(ip_address, fill_region)
+
+async def search_in_model_batch_service(searches: List[str], ip_address: str, user_agent: Optional[str]):
+    """Classify many Wikipedia URLs at once. Every URL gets its own result or
+    error, in request order."""
+    logger.info(f"Received batch of {len(searches)} searches from IP: {ip_address}")
+
+    if not await model_registry.get():
+        return {"error": "Model is not loaded. Please check the model path and ensure it is properly trained."}
+
+    region_data = get_region(ip_address)
+    results = await classify_searches(searches, 0, ip_address, user_agent, region_data)
+
+    logger.info(f"Batch of {len(searches)} searches classified")
+
+    return {
+        "results": results,
+        "ip_address": ip_address,
+        "region": region_data,
+        "user_agent": user_agent
     }
+
+async def stream_batch_search_service(searches: List[str], ip_address: str, user_agent: Optional[str]):
+    """Streaming variant of search_in_model_batch_service.
+
+    The batch is split into MAX_TITLES_PER_QUERY-sized chunks that run
+    concurrently; each chunk's results are yielded as soon as it finishes, so
+    they arrive out of order and carry their request `index`.
+    """
+    logger.info(f"Received streamed batch of {len(searches)} searches from IP: {ip_address}")
+
+    if not await model_registry.get():
+        yield {"error": "Model is not loaded. Please check the model path and ensure it is properly trained."}
+        return
+
+    region_data = get_region(ip_address)
+
+    async def classify_chunk(offset: int):
+        chunk = searches[offset:offset + MAX_TITLES_PER_QUERY]
+        try:
+            return await classify_searches(chunk, offset, ip_address, user_agent, region_data)
+        except Exception as e:
+            # One failed chunk still answers each of its URLs
+            logger.error(f"Failed to classify searches {offset}-{offset + len(chunk) - 1}: {e}")
+            return [
+                {"index": offset + i, "search": search, "error": f"Failed to perform search: {e}"}
+                for i, search in enumerate(chunk)
+            ]
+
+    tasks = [asyncio.ensure_future(classify_chunk(i)) for i in range(0, len(searches), MAX_TITLES_PER_QUERY)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            for result in await finished:
+                yield result
+    finally:
+        # The client went away or the stream was closed early
+        for task in tasks:
+            task.cancel()
+
+async def export_search_history(db: AsyncSession, limit: Optional[int] = None):
+    """Yield search history rows oldest first, streamed from the DB in batches."""
+    query = select(SearchHistory).order_by(SearchHistory.id).execution_options(yield_per=HISTORY_EXPORT_BATCH_SIZE)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = await db.stream_scalars(query)
+    async for row in rows:
+        yield row.to_dict()
+
+  
+
+async def fetch_on_this_day_feed(project: str, month: str, day: str):
+    """Raw on-this-day feed for a project and month/day."""
+    url = get_project(project).on_this_day_url(month, day)
+    response = await get_http_client().get(url, headers=DEFAULT_HEADERS, project=project)
+    response.raise_for_status()
+    return response.json()
+
+
+@cached("on_this_day_pool", partition_by="project")
+async def fetch_on_this_day_pool(project: str, month: str, day: str):
+    """Event pool for a project and month/day; cached since the feed only changes daily."""
+    raw_data = await fetch_on_this_day_feed(project, month, day)
+    return build_on_this_day_pool(raw_data, month, day)
+
+
+def get_local_month_day(timezone="UTC"):
+    # Get the current date based on the user's timezone
+    tz = pytz.timezone(timezone)
+    date = dt.now(tz)
     
-        # Construct the API URL
-        url = f"https://en.wikipedia.org/api/rest_v1/feed/onthisday/all/{formatted_month}/{formatted_day}"
-        print(url)
-        
-        # Fetch data from the API with a timeout
-        response = requests.get(url, timeout=10, headers=headers)
-        
-        if response.status_code == 200:
-            raw_data = response.json()
-            
-            # Shuffle categories for randomness
-            shuffled_categories = list(raw_data.items())
-            random.shuffle(shuffled_categories)
-            
-            data = []
-            seen_years = set()  # Track distinct years
-
-            # Process each section of the API response
-            for category, items in shuffled_categories:
-                if isinstance(items, list):
-                    random.shuffle(items)  # Shuffle items in each category
-
-                    for item in items:
-                        year = item.get("year", "")
-                        if not year or year in seen_years:
-                            continue  # Skip duplicate years
-
-                        if "pages" in item and len(item["pages"]) > 0:
-                            random.shuffle(item["pages"])  # Shuffle pages within each item
-
-                            for page in item["pages"]:
-                                event = {
-                                    "title": page.get("title", ""),
-                                    "displayTitle": page.get("displaytitle", "").replace("<span class=\"mw-page-title-main\">", "").replace("</span>", ""),
-                                    "year": year,
-                                    "date": f"{formatted_month}/{formatted_day}",
-                                    "text": item.get("text", ""),
-                                    "extract": page.get("extract", ""),
-                                    "category": category,
-                                    "url": page.get("content_urls", {}).get("desktop", {}).get("page", ""),
-                                    "description": page.get("description", ""),
-                                    "image": None  # Default to None
-                                }
-
-                                # Add thumbnail image if available
-                                if "thumbnail" in page:
-                                    event["image"] = {
-                                        "source": page["thumbnail"].get("source", ""),
-                                        "width": page["thumbnail"].get("width", ""),
-                                        "height": page["thumbnail"].get("height", "")
-                                    }
-                                # If no thumbnail but original image exists
-                                elif "originalimage" in page:
-                                    event["image"] = {
-                                        "source": page["originalimage"].get("source", ""),
-                                        "width": page["originalimage"].get("width", ""),
-                                        "height": page["originalimage"].get("height", "")
-                                    }
-
-                                # Only add events that have images
-                                if event["image"] is not None:
-                                    data.append(event)
-                                    seen_years.add(year)  # Mark this year as used
-
-                                    # Stop once we have 5 unique years
-                                    if len(data) >= 5:
-                                        return data
-
-            return data  # Ensure we return at most 5 unique year items
-        else:
-            print(f"Error fetching data: {response.status_code}")
+    # Extract the month and day
+    return f"{date.month:02d}", f"{date.day:02d}"
+
+def strip_html(text: str) -> str:
+    return html.unescape(HTML_TAG.sub("", text))
+
+def page_image(page: dict):
+    # Thumbnail if available, else the original image
+    image = page.get("thumbnail") or page.get("originalimage")
+    if not image:
+        return None
+    return {
+        "source": image.get("source", ""),
+        "width": image.get("width", ""),
+        "height": image.get("height", "")
+    }
+
+def build_on_this_day_pool(raw_data, formatted_month, formatted_day):
+    """Parse a raw feed once into [year, events] groups, keeping only pages
+    with an image. Plain lists so the pool survives the persistent cache."""
+    by_year = {}
+    for category, items in raw_data.items():
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            year = item.get("year", "")
+            if not year:
+                continue
+            for page in item.get("pages") or []:
+                image = page_image(page)
+                if image is None:
+                    continue  # Only events that have images
+                by_year.setdefault(year, []).append({
+                    "title": page.get("title", ""),
+                    "displayTitle": strip_html(page.get("displaytitle", "")),
+                    "year": year,
+                    "date": f"{formatted_month}/{formatted_day}",
+                    "text": item.get("text", ""),
+                    "extract": page.get("extract", ""),
+                    "category": category,
+                    "url": page.get("content_urls", {}).get("desktop", {}).get("page", ""),
+                    "description": page.get("description", ""),
+                    "image": image
+                })
+    return [[year, events] for year, events in by_year.items()]
+
+def sample_on_this_day(pool, count: int = ON_THIS_DAY_EVENTS, seed: Optional[int] = None):
+    """Up to `count` events from distinct years, picked at random; the same
+    seed picks the same events from the same pool."""
+    rng = random.Random(seed) if seed is not None else random
+    groups = rng.sample(pool, min(count, len(pool)))
+    # Copies, the cached pool is shared between requests
+    return [dict(rng.choice(events)) for _, events in groups]
+
+
+async def get_on_this_day_data(timezone="UTC", project: str = DEFAULT_PROJECT, seed: Optional[int] = None):
+    try:
+        formatted_month, formatted_day = get_local_month_day(timezone)
+        try:
+            pool = await fetch_on_this_day_pool(project, formatted_month, formatted_day)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Error fetching on this day data: {e.response.status_code}")
             return []
+
+        return sample_on_this_day(pool, seed=seed)
     
-    except requests.exceptions.RequestException as e:
-        print(f"Request error: {e}")
+    except httpx.HTTPError as e:
+        logger.error(f"Request error fetching on this day data: {e}")
         return []
 
 
 def get_yesterdays_date():
-    # Get yesterday's date
-    yesterday = dt.now() - timedelta(days=1)
+    # Get yesterday's date, in UTC like the pageview APIs and the local index
+    yesterday = dt.now(pytz.utc) - timedelta(days=1)
     return yesterday.strftime('%Y/%m/%d')
 
-def get_top_trending_articles():
+@cached("top_pageviews", partition_by="project")
+async def fetch_top_pageviews(project: str, date: str):
+    """Raw top-1000 pageviews list for a project and YYYY/MM/DD date."""
+    url = get_project(project).top_pageviews_url(date)
+    response = await get_http_client().get(url, headers=DEFAULT_HEADERS, project=project)
+    response.raise_for_status()
+    return response.json()
+
+def build_top_trending(data, project: str = DEFAULT_PROJECT):
+    """Turn a raw top-pageviews payload into the top 4 article cards."""
+    wiki = get_project(project)
+    # Extract exactly 4 valid articles, skipping "Special:Search"
+    top_articles = []
+    articles = data.get("items", [])[0].get("articles", [])
+    total_count = 0
+    for article_data in articles[2:]:  # Start from index 2 as before
+        if isinstance(article_data, dict):
+            title = article_data.get("article", "Unknown Title").replace("_", " ")
+
+            if title == "Special:Search" or title == "Wikipedia:Featured pictures":
+                continue
+
+            total_count += 1
+            top_articles.append({
+                "title": title,
+                "pageviews": article_data.get("views", 0),
+                "rank": total_count or "Unknown Rank",
+                "article_url": wiki.article_url(article_data.get("article", "Unknown"))
+            })
+
+        if len(top_articles) == 4:
+            break
+
+    return top_articles
+
+def build_index_trending(project: str = DEFAULT_PROJECT):
+    """Top articles by view acceleration from the local pageview index, or
+    None when the index doesn't hold yesterday yet."""
+    wiki = get_project(project)
+    engine = trending_engines.get(wiki.code)
+    index = pageview_index.get(wiki.code)
+    yesterday = (dt.now(pytz.utc) - timedelta(days=1)).date()
+    if index is None or index.last_day != yesterday or not engine.refresh_from_index(index):
+        return None
+    return [
+        {
+            "title": article["title"].replace("_", " "),
+            "pageviews": round(article["views"]),
+            "rank": rank,
+            "article_url": wiki.article_url(article["title"]),
+            "baseline_views": round(article["baseline"]),
+            "trend_score": article["score"],
+        }
+        for rank, article in enumerate(engine.top(), start=1)
+    ]
+
+async def get_top_trending_articles(project: str = DEFAULT_PROJECT):
+    # Prefer articles that are rising over the index; fall back to the raw top list
+    trending = await asyncio.to_thread(build_index_trending, project)
+    if trending is not None:
+        return trending
+
     # Get yesterday's date dynamically
     yesterday_date = get_yesterdays_date()
     
-    print(f"Yesterday's date: {yesterday_date}")
-    
-    # Construct the URL for the API request
-    url = f"https://wikimedia.org/api/rest_v1/metrics/pageviews/top/en.wikipedia/all-access/{yesterday_date}"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
-    }
-    
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        data = response.json()
-        
-        # Extract exactly 4 valid articles, skipping "Special:Search"
-        top_articles = []
-        articles = data.get("items", [])[0].get("articles", [])
-        total_count = 0
-        for article_data in articles[2:]:  # Start from index 2 as before
-            if isinstance(article_data, dict):
-                title = article_data.get("article", "Unknown Title").replace("_", " ")
-                
-                if title == "Special:Search" or title == "Wikipedia:Featured pictures":
-                    continue
-                
-                total_count += 1
-                top_articles.append({
-                    "title": title,
-                    "pageviews": article_data.get("views", 0),
-                    "rank": total_count or "Unknown Rank",
-                    "article_url": f"https://en.wikipedia.org/wiki/{article_data.get('article', 'Unknown')}"
-                })
 
-            if len(top_articles) == 4:
-                break
+    try:
+        data = await fetch_top_pageviews(project, yesterday_date)
+    except httpx.HTTPStatusError as e:
+        return f"Error: {e.response.status_code}"
 
-        return top_articles
-    else:
-        return f"Error: {response.status_code}"
+    return build_top_trending(data, project)
 
 
 
-def article_engagement(wiki_url):
-    article_title = extract_article_title(wiki_url)
-    past_data = get_past_week_views(article_title)
+async def article_engagement(wiki_url, model: str = "log_linear", project: Optional[str] = None):
+    """Past week of views and a forecast for an article. The wiki project
+    comes from the URL; `project` is used for bare titles and other links
+    that aren't Wikipedia article URLs."""
+    if model not in FORECAST_MODELS:
+        return {"error": f"Unknown forecast model '{model}', expected one of {sorted(FORECAST_MODELS)}"}
+    try:
+        wiki, article_title = parse_wiki_url(wiki_url)
+    except ValueError:
+        wiki, article_title = None, extract_article_title(wiki_url)
+    try:
+        if wiki is None:
+            wiki = get_project(project)
+        elif project and get_project(project) is not wiki:
+            return {"error": f"{wiki_url} belongs to project '{wiki.code}', not '{project}'"}
+    except ValueError as e:
+        return {"error": str(e)}
+    past_data = await get_past_week_views(wiki.code, article_title)
     if len(past_data) == 0:
         return {
             "error": f"No pageviews data found for article {article_title}"
         }
-    future_data = predict_future_views(past_data)
+    future_data = predict_future_views(past_data, model)
     
     return {
         "article": article_title,
+        "project": wiki.code,
         "past": past_data,
         "future": future_data
     }
\ No newline at end of file
@@ -0,0 +1,61 @@
+import gzip
+from datetime import date, timedelta
+
+from utils.pageview_index import PageviewIndex, index_path, ingest_dumps
+
+DAY = date(2026, 3, 10)
+
+
+def write_dump(directory, day, hour, lines, suffix=".gz"):
+    path = directory / f"pageviews-{day:%Y%m%d}-{hour:02d}0000{suffix}"
+    with gzip.open(path, "wt") as f:
+        f.write("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_ingest_and_lookup(tmp_path):
+    dumps = [
+        write_dump(tmp_path, DAY, 0, ["en Albert_Einstein 10 0", "en.m Albert_Einstein 5 0", "de Berlin 7 0", "en.b Book 99 0"]),
+        write_dump(tmp_path, DAY, 1, ["en albert_Einstein 1 0", "en Tōkyō 3 0", "bad line", "en X notanint 0"]),
+    ]
+    # Small runs so the sorted-run merge is exercised
+    written = ingest_dumps(dumps, str(tmp_path / "index"), ["en", "de"], window=3, run_size=2)
+    assert written == {"de": 1, "en": 2}
+
+    index = PageviewIndex(index_path(str(tmp_path / "index"), "en"))
+    try:
+        assert (index.first_day, index.last_day) == (DAY - timedelta(days=2), DAY)
+        assert index.series("Albert Einstein", DAY - timedelta(days=2), DAY) == [0, 0, 16]
+        assert index.series("tōkyō", DAY, DAY) == [3]
+        assert index.series("Missing", DAY, DAY) == []
+        assert index.series("Albert Einstein", DAY - timedelta(days=5), DAY) is None
+    finally:
+        index.close()
+
+
+def test_window_rolls_over(tmp_path):
+    directory = str(tmp_path / "index")
+    ingest_dumps([write_dump(tmp_path, DAY, 0, ["en Old 4 0", "en Kept 1 0"])], directory, ["en"], window=2)
+    # Daily dump of automated traffic only counts towards all agents
+    automated = tmp_path / f"pageviews-{DAY + timedelta(days=1):%Y%m%d}-automated.gz"
+    with gzip.open(automated, "wt") as f:
+        f.write("en.wikipedia Kept 6 desktop 6 F6\n")
+    ingest_dumps([write_dump(tmp_path, DAY + timedelta(days=1), 0, ["en Kept 2 0"]), str(automated)], directory, ["en"], window=2)
+
+    index = PageviewIndex(index_path(directory, "en"))
+    try:
+        assert index.series("Kept", DAY, DAY + timedelta(days=1)) == [1, 2]
+        assert index.series("Kept", DAY, DAY + timedelta(days=1), "all-agents") == [1, 8]
+    finally:
+        index.close()
+
+    ingest_dumps([write_dump(tmp_path, DAY + timedelta(days=2), 0, ["en Kept 3 0"])], directory, ["en"], window=2)
+    index = PageviewIndex(index_path(directory, "en"))
+    try:
+        # DAY has left the window, taking "Old" (no views since) with it
+        assert index.first_day == DAY + timedelta(days=1)
+        assert index.series("Kept", DAY + timedelta(days=1), DAY + timedelta(days=2)) == [2, 3]
+        assert index.find("Old") is None
+        assert index.count == 1
+    finally:
+        index.close()
@@ -0,0 +1,243 @@
+import asyncio
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+from config.env import Env
+from utils.metrics import metrics
+
+# TTL (seconds) per kind of upstream response
+CACHE_TTLS = {
+    "on_this_day_pool": 24 * 3600,  # keyed by month/day, the feed changes daily
+    "top_pageviews": 24 * 3600,     # keyed by date, immutable once published
+    "pageviews": 3600,              # keyed by window, refreshed as the day fills in
+    "features": 15 * 60,            # article metadata, edits happen any time
+}
+
+_MISSING = object()
+
+
+class LRUCache:
+    """In-process LRU cache where every entry carries its own expiry."""
+
+    def __init__(self, max_entries: int = Env.CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Shared cache backed by a local SQLite file, so several workers can reuse
+    each other's upstream responses. Values must be JSON-serialisable."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return _MISSING, 0
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value, expires_at: float):
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """LRU in front of an optional shared backend, with single-flight loads.
+
+    Concurrent misses for the same key share one in-flight fetch instead of
+    each calling upstream. Entries can be kept in a named partition (one per
+    wiki project) with its own LRU, so one partition's hot keys never evict
+    another's.
+    """
+
+    def __init__(
+        self, local: LRUCache, shared: Optional[SQLiteCacheBackend] = None, partition_entries: int = Env.CACHE_PROJECT_ENTRIES
+    ):
+        self.local = local
+        self.shared = shared
+        self.partition_entries = partition_entries
+        self.partitions: Dict[str, LRUCache] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = defaultdict(lambda: {"hits": 0, "shared_hits": 0, "misses": 0, "coalesced": 0})
+
+    def _local_for(self, partition: Optional[str]) -> LRUCache:
+        if partition is None:
+            return self.local
+        local = self.partitions.get(partition)
+        if local is None:
+            local = self.partitions[partition] = LRUCache(self.partition_entries)
+        return local
+
+    async def get_or_fetch(
+        self, namespace: str, key: str, fetch: Callable[[], Awaitable[Any]], ttl: float, partition: Optional[str] = None
+    ):
+        full_key = f"{namespace}:{key}"
+        stats = self._stats[namespace]
+        local = self._local_for(partition)
+
+        value = local.get(full_key)
+        if value is not _MISSING:
+            stats["hits"] += 1
+            return value
+
+        inflight = self._inflight.get(full_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._load(namespace, full_key, fetch, ttl, local))
+            self._inflight[full_key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(full_key, None))
+        else:
+            stats["coalesced"] += 1
+
+        # Shield so one cancelled caller doesn't cancel the load for the others
+        return await asyncio.shield(inflight)
+
+    async def _load(self, namespace: str, full_key: str, fetch, ttl: float, local: LRUCache):
+        stats = self._stats[namespace]
+
+        if self.shared is not None:
+            try:
+                value, expires_at = await asyncio.to_thread(self.shared.get, full_key)
+            except Exception as e:
+                logger.warning(f"Shared cache read failed for {full_key}: {e}")
+                value = _MISSING
+            if value is not _MISSING:
+                stats["shared_hits"] += 1
+                local.set(full_key, value, expires_at)
+                return value
+
+        stats["misses"] += 1
+        value = await fetch()
+        expires_at = time.time() + ttl
+        local.set(full_key, value, expires_at)
+
+        if self.shared is not None:
+            try:
+                await asyncio.to_thread(self.shared.set, full_key, value, expires_at)
+            except Exception as e:
+                logger.warning(f"Shared cache write failed for {full_key}: {e}")
+        return value
+
+    def stats(self) -> dict:
+        result = {}
+        for namespace, counters in self._stats.items():
+            lookups = counters["hits"] + counters["shared_hits"] + counters["misses"] + counters["coalesced"]
+            served = lookups - counters["misses"]
+            result[namespace] = {**counters, "hit_ratio": round(served / lookups, 4) if lookups else 0.0}
+        result["_local_entries"] = len(self.local) + sum(len(local) for local in self.partitions.values())
+        result["_partition_entries"] = {name: len(local) for name, local in self.partitions.items()}
+        return result
+
+    def clear(self):
+        self.local.clear()
+        self.partitions.clear()
+        self._stats.clear()
+
+
+def _build_cache() -> TieredCache:
+    shared = None
+    if Env.CACHE_BACKEND_PATH:
+        try:
+            shared = SQLiteCacheBackend(Env.CACHE_BACKEND_PATH)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open shared cache at {Env.CACHE_BACKEND_PATH}: {e}")
+    return TieredCache(LRUCache(), shared)
+
+
+# Global cache shared by every upstream fetcher
+cache = _build_cache()
+
+
+def cached(namespace: str, ttl: Optional[float] = None, partition_by: Optional[str] = None):
+    """Cache an async fetcher's result under `namespace`, keyed by its arguments.
+
+    With `partition_by`, entries are kept in the cache partition named by
+    that argument's value (e.g. the wiki project).
+    Exceptions are never cached, so fetchers should raise rather than return
+    a placeholder on upstream failure.
+    """
+    expiry = ttl if ttl is not None else CACHE_TTLS[namespace]
+
+    def decorator(func):
+        signature = inspect.signature(func) if partition_by else None
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = "|".join([str(arg) for arg in args] + [f"{k}={v}" for k, v in sorted(kwargs.items())])
+            partition = None
+            if signature is not None:
+                partition = str(signature.bind(*args, **kwargs).arguments[partition_by])
+            return await cache.get_or_fetch(namespace, key, lambda: func(*args, **kwargs), expiry, partition)
+        return wrapper
+    return decorator
+
+
+def get_cache_stats() -> dict:
+    return cache.stats()
+
+
+CACHE_LOOKUPS = metrics.counter("cache_lookups_total", "Upstream cache lookups by namespace and outcome", ("namespace", "result"))
+CACHE_HIT_RATIO = metrics.gauge("cache_hit_ratio", "Share of lookups served without an upstream call", ("namespace",))
+CACHE_ENTRIES = metrics.gauge("cache_local_entries", "Entries in the in-process cache")
+CACHE_PARTITION_ENTRIES = metrics.gauge("cache_partition_entries", "Entries per wiki project cache partition", ("partition",))
+
+
+def _collect_cache_metrics():
+    stats = cache.stats()
+    CACHE_ENTRIES.set(stats.pop("_local_entries"))
+    for partition, entries in stats.pop("_partition_entries").items():
+        CACHE_PARTITION_ENTRIES.set(entries, partition=partition)
+    for namespace, counters in stats.items():
+        for result in ("hits", "shared_hits", "misses", "coalesced"):
+            CACHE_LOOKUPS.set(counters[result], namespace=namespace, result=result)
+        CACHE_HIT_RATIO.set(counters["hit_ratio"], namespace=namespace)
+
+
+metrics.add_collector(_collect_cache_metrics)
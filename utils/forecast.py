@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Callable, Dict
+
+from utils.lazy_imports import LazyModule
+
+np = LazyModule("numpy")
+
+# Days forecast by /engagement-chart
+FORECAST_DAYS = 4
+
+# Smoothing factors for the exponential smoothing model
+SMOOTHING_LEVEL = 0.5
+SMOOTHING_TREND = 0.3
+
+
+def log_linear(views: np.ndarray, horizon: int) -> np.ndarray:
+    """Least-squares line through log1p(views), solved in closed form per row.
+
+    Same fit as the original LinearRegression version: x counts days back
+    from the newest point (newest = 0) and the horizon continues that axis,
+    so predictions are evaluated at x = n, n + 1, ... .
+    """
+    n = views.shape[1]
+    x = np.arange(n - 1, -1, -1, dtype=float)
+    y = np.log1p(views)
+
+    x_centered = x - x.mean()
+    y_mean = y.mean(axis=1, keepdims=True)
+    denominator = (x_centered ** 2).sum()
+    slope = ((y - y_mean) @ x_centered) / denominator if denominator else np.zeros(len(views))
+    intercept = y_mean[:, 0] - slope * x.mean()
+
+    future_x = np.arange(n, n + horizon, dtype=float)
+    return np.expm1(intercept[:, None] + slope[:, None] * future_x)
+
+
+def weekly_seasonal(views: np.ndarray, horizon: int) -> np.ndarray:
+    """Seasonal naive: each day repeats the same weekday one week earlier.
+
+    Falls back to the last value when the series is shorter than a week.
+    """
+    n = views.shape[1]
+    if n < 7:
+        return np.repeat(views[:, -1:], horizon, axis=1)
+    steps = np.arange(horizon)
+    return views[:, n - 7 + steps % 7]
+
+
+def exponential_smoothing(views: np.ndarray, horizon: int) -> np.ndarray:
+    """Holt's linear exponential smoothing (level + trend), all rows at once."""
+    level = views[:, 0].copy()
+    trend = views[:, 1] - views[:, 0]
+    for t in range(1, views.shape[1]):
+        previous = level
+        level = SMOOTHING_LEVEL * views[:, t] + (1 - SMOOTHING_LEVEL) * (level + trend)
+        trend = SMOOTHING_TREND * (level - previous) + (1 - SMOOTHING_TREND) * trend
+    return level[:, None] + trend[:, None] * np.arange(1, horizon + 1)
+
+
+FORECAST_MODELS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "log_linear": log_linear,
+    "weekly_seasonal": weekly_seasonal,
+    "exponential_smoothing": exponential_smoothing,
+}
+
+
+def forecast(views, horizon: int = FORECAST_DAYS, model: str = "log_linear") -> np.ndarray:
+    """Forecast daily views for many series at once.
+
+    `views` is a 2-D array with one row per article and one column per day,
+    oldest first; every row needs at least two days. Returns an int array of
+    shape (articles, horizon), truncated and clipped at zero.
+    """
+    if model not in FORECAST_MODELS:
+        raise ValueError(f"Unknown forecast model '{model}', expected one of {sorted(FORECAST_MODELS)}")
+    views = np.asarray(views, dtype=float)
+    if views.ndim != 2 or views.shape[1] < 2:
+        raise ValueError("views must be a 2-D array with at least two days per row")
+    predicted = FORECAST_MODELS[model](views, horizon)
+    return np.maximum(np.trunc(predicted), 0).astype(np.int64)
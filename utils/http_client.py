@@ -0,0 +1,151 @@
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+from loguru import logger
+
+from config.env import Env
+from utils.rate_governor import rate_governor
+from utils.metrics import UPSTREAM_DURATION, add_request_timing
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
+
+# Upstream statuses worth another attempt
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class WikimediaClient:
+    """Async HTTP client shared by every outbound Wikimedia/ipstack call.
+
+    Connections are kept alive in one pool per wiki project (or per host for
+    calls that don't belong to a project), so a busy wiki can't hold every
+    connection. Each pool and host gets its own concurrency limit, and
+    transient failures are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        timeout: float = Env.HTTP_TIMEOUT,
+        max_connections: int = Env.HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = Env.HTTP_MAX_KEEPALIVE,
+        per_host_limit: int = Env.HTTP_PER_HOST_LIMIT,
+        retries: int = Env.HTTP_RETRIES,
+        backoff: float = Env.HTTP_BACKOFF,
+        upstream_override: Optional[str] = Env.HTTP_UPSTREAM_OVERRIDE,
+    ):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.upstream_override = upstream_override.rstrip("/") if upstream_override else None
+        self._pools: Dict[str, httpx.AsyncClient] = {}
+        self._host_limits: Dict[tuple, asyncio.Semaphore] = {}
+
+    def _pool(self, name: str) -> httpx.AsyncClient:
+        client = self._pools.get(name)
+        if client is None:
+            client = self._pools[name] = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                ),
+                headers={"User-Agent": USER_AGENT},
+                follow_redirects=True,
+            )
+        return client
+
+    def _host_limit(self, pool: str, host: str) -> asyncio.Semaphore:
+        key = (pool, host)
+        semaphore = self._host_limits.get(key)
+        if semaphore is None:
+            semaphore = self._host_limits[key] = asyncio.Semaphore(self.per_host_limit)
+        return semaphore
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def _redirect(self, url: str, headers: Optional[dict]):
+        # Send the request to the override base URL instead, keeping path and
+        # query; the real host travels in X-Upstream-Host
+        parsed = urlparse(url)
+        target = self.upstream_override + parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        return target, {**(headers or {}), "X-Upstream-Host": parsed.netloc}
+
+    def _record(self, endpoint: str, status, elapsed: float):
+        UPSTREAM_DURATION.observe(elapsed, endpoint=endpoint, status=status)
+        add_request_timing("upstream", elapsed)
+
+    async def get(
+        self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None, project: Optional[str] = None
+    ) -> httpx.Response:
+        """GET a URL, retrying transport errors and retryable statuses.
+
+        `project` is the wiki the call is made for and picks the connection
+        pool and rate budget (shared hosts like wikimedia.org serve every
+        project). Every attempt goes through the rate governor for its
+        endpoint, which applies the token bucket, Retry-After pauses and
+        adaptive concurrency.
+        The last response is returned as-is once retries are exhausted so
+        callers can keep checking ``status_code`` themselves; transport errors
+        are re-raised.
+        """
+        host = urlparse(url).netloc
+        pool_name = project or host
+        pool = self._pool(pool_name)
+        governor = rate_governor.for_url(url, project)
+        if self.upstream_override:
+            url, headers = self._redirect(url, headers)
+        attempt = 0
+        while True:
+            try:
+                async with self._host_limit(pool_name, host), governor.slot():
+                    started = time.monotonic()
+                    try:
+                        response = await pool.get(url, params=params, headers=headers)
+                    except httpx.TransportError:
+                        elapsed = time.monotonic() - started
+                        governor.observe(elapsed)
+                        self._record(governor.name, "error", elapsed)
+                        raise
+                    elapsed = time.monotonic() - started
+                    governor.observe(elapsed, response.status_code, response.headers.get("Retry-After"))
+                    self._record(governor.name, response.status_code, elapsed)
+            except httpx.TransportError as e:
+                if attempt >= self.retries:
+                    raise
+                logger.warning(f"Request to {host} failed ({e!r}), retrying")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                logger.warning(f"Request to {host} returned {response.status_code}, retrying")
+
+            await asyncio.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+    async def aclose(self):
+        for client in self._pools.values():
+            await client.aclose()
+        self._pools.clear()
+
+
+# Global client, created on first use
+_http_client: Optional[WikimediaClient] = None
+
+def get_http_client() -> WikimediaClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = WikimediaClient()
+    return _http_client
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
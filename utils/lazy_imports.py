@@ -0,0 +1,97 @@
+import importlib
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+# Modules worth importing ahead of the first request that needs them
+HEAVY_MODULES = ["numpy", "joblib", "sklearn.linear_model"]
+
+# When each lazily imported module was actually loaded, and how long it took
+_import_log: Dict[str, dict] = {}
+_import_lock = threading.Lock()
+
+
+def _record(name: str, seconds: float):
+    with _import_lock:
+        _import_log.setdefault(name, {"module": name, "seconds": round(seconds, 4), "loaded_at": time.time()})
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Lets heavy dependencies stay at the top of the file as usual
+    (`np = LazyModule("numpy")`) without costing every cold start.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        started = time.perf_counter()
+        module = importlib.import_module(self._name)
+        _record(self._name, time.perf_counter() - started)
+        self._module = module
+        return module
+
+    def __getattr__(self, attr: str):
+        module = self._module or self._load()
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def warm_imports(modules: List[str] = HEAVY_MODULES):
+    """Import heavy modules now (meant to run in a background thread)."""
+    for name in modules:
+        if name in _import_log:
+            continue
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"Could not pre-import {name}: {e}")
+            continue
+        _record(name, time.perf_counter() - started)
+
+
+def import_report(app_import_seconds: Optional[float] = None) -> dict:
+    """Startup cost so far: app import time plus every deferred import."""
+    with _import_lock:
+        deferred = sorted(_import_log.values(), key=lambda entry: entry["loaded_at"])
+    return {
+        "app_import_seconds": round(app_import_seconds, 4) if app_import_seconds is not None else None,
+        "deferred_imports": deferred,
+        "loaded": {name: name in sys.modules for name in HEAVY_MODULES},
+    }
+
+
+def profile_imports(target: str = "main", top: int = 25) -> List[tuple]:
+    """Run `python -X importtime -c "import <target>"` in a fresh interpreter
+    and return the slowest modules as (cumulative_us, self_us, module)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    # python -m utils.lazy_imports [module] [top]
+    target = sys.argv[1] if len(sys.argv) > 1 else "main"
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, module in profile_imports(target, top):
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {module}")
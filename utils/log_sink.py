@@ -0,0 +1,223 @@
+import glob
+import gzip
+import json
+import os
+import queue
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from config.env import Env
+from utils.metrics import metrics
+
+_STOP = object()
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """"service.wikipedia_service=0.2,controller=0.5" -> {module prefix: rate}."""
+    rates = {}
+    for pair in spec.split(","):
+        if "=" in pair:
+            name, rate = pair.split("=", 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class LogSampler:
+    """loguru filter that keeps a fraction of records per logger (module).
+
+    The longest matching module prefix wins. WARNING and above are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        # Longest prefix first so "service.wikipedia_service" beats "service"
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def __call__(self, record) -> bool:
+        if not self.rates or record["level"].no >= 30:
+            return True
+        name = record["name"] or ""
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class JsonLogSink:
+    """loguru sink that hands records to a background thread as JSON lines.
+
+    The calling thread (usually the event loop) only builds a small dict
+    and puts it on a bounded queue; records are dropped and counted when
+    the queue is full instead of blocking. The writer thread batches
+    records into one write, folds consecutive repeats of the same
+    message into a single record with a `repeated` count, rotates the file
+    by size and gzips rotated files on a separate thread.
+    """
+
+    def __init__(
+        self,
+        path: str = Env.LOG_FILE,
+        max_bytes: int = Env.LOG_ROTATION_BYTES,
+        retention_days: float = Env.LOG_RETENTION_DAYS,
+        queue_size: int = Env.LOG_QUEUE_SIZE,
+        batch_size: int = Env.LOG_BATCH_SIZE,
+        flush_interval: float = Env.LOG_FLUSH_INTERVAL,
+        dedup_window: float = Env.LOG_DEDUP_WINDOW,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedup_window = dedup_window
+        self.stats = {"written": 0, "dropped": 0, "deduplicated": 0, "rotations": 0}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+        self._file = None
+        self._last: Optional[dict] = None
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message):
+        record = message.record
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "logger": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+            "message": record["message"],
+        }
+        if record["extra"]:
+            entry.update(record["extra"])
+        if record["exception"] is not None:
+            entry["exception"] = f"{record['exception'].type.__name__}: {record['exception'].value}"
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._write([])  # idle: release a held-back repeated message
+                continue
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stopping:
+                break
+        self._write([], final=True)
+
+    def _dedupe(self, batch: List[dict]) -> List[dict]:
+        out = []
+        for entry in batch:
+            last = self._last
+            if (
+                last is not None
+                and entry["message"] == last["message"]
+                and entry["level"] == last["level"]
+                and entry["logger"] == last["logger"]
+                and time.monotonic() - last["_first_seen"] < self.dedup_window
+            ):
+                last["repeated"] = last.get("repeated", 1) + 1
+                self.stats["deduplicated"] += 1
+                continue
+            if last is not None:
+                out.append(last)
+            entry["_first_seen"] = time.monotonic()
+            self._last = entry
+        # The newest message is held back only while repeats can still fold into it
+        if self._last is not None and time.monotonic() - self._last["_first_seen"] >= self.dedup_window:
+            out.append(self._last)
+            self._last = None
+        return out
+
+    def _write(self, batch: List[dict], final: bool = False):
+        entries = self._dedupe(batch)
+        if final and self._last is not None:
+            entries.append(self._last)
+            self._last = None
+        if entries:
+            for entry in entries:
+                entry.pop("_first_seen", None)
+            payload = "".join(json.dumps(entry, default=str) + "\n" for entry in entries)
+            try:
+                self._open().write(payload)
+                self._file.flush()
+                self.stats["written"] += len(entries)
+                if self._file.tell() >= self.max_bytes:
+                    self._rotate()
+            except OSError:
+                self.stats["dropped"] += len(entries)
+        if final and self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        stamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M-%S_%f")
+        rotated = f"{self.path}.{stamp}"
+        os.replace(self.path, rotated)
+        self.stats["rotations"] += 1
+        self._compressor.submit(self._compress, rotated)
+
+    def _compress(self, rotated: str):
+        with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+        cutoff = time.time() - self.retention_days * 86400
+        for old in glob.glob(f"{self.path}.*.gz"):
+            if os.path.getmtime(old) < cutoff:
+                os.remove(old)
+
+    def stop(self):
+        """Flush queued records and wait for pending compression."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._compressor.shutdown(wait=True)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "queued": self._queue.qsize()}
+
+
+LOG_RECORDS = metrics.counter("log_records_total", "Log records by outcome in the JSON sink", ("outcome",))
+LOG_QUEUE_DEPTH = metrics.gauge("log_queue_depth", "Log records waiting for the writer thread")
+
+
+def register_sink_metrics(sink: JsonLogSink):
+    def collect():
+        stats = sink.get_stats()
+        for outcome in ("written", "dropped", "deduplicated"):
+            LOG_RECORDS.set(stats[outcome], outcome=outcome)
+        LOG_QUEUE_DEPTH.set(stats["queued"])
+    metrics.add_collector(collect)
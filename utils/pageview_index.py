@@ -0,0 +1,468 @@
+import argparse
+import bz2
+import gzip
+import heapq
+import itertools
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from config.env import Env
+from utils.lazy_imports import LazyModule
+from utils.metrics import metrics
+
+np = LazyModule("numpy")
+
+# Local daily pageview index, one file per wiki project (all integers big-endian):
+#   header : magic, title count, day count, ordinal of the first day
+#   offsets: title count + 1 uint64 offsets into the title blob
+#   titles : sorted UTF-8 titles (underscores, first letter upper-case), back to back
+#   counts : per title, `days` uint32 user views then `days` uint32 all-agent views
+# Titles are binary searched in place through mmap, so a lookup reads a
+# handful of pages instead of loading the index.
+PAGEVIEW_MAGIC = b"WPVIDX01"
+PAGEVIEW_HEADER = struct.Struct(">8sIII")
+OFFSET = struct.Struct(">Q")
+
+# Access methods in the daily "pageview complete" dump lines
+ACCESS_METHODS = {"desktop", "mobile-web", "mobile-app"}
+
+_DUMP_DATE = re.compile(r"(\d{8})")
+
+
+def index_key(title: str) -> str:
+    """Title as stored in the index: underscores, first letter upper-case
+    (MediaWiki treats the first letter case-insensitively)."""
+    title = title.strip().replace(" ", "_")
+    return title[:1].upper() + title[1:]
+
+
+def index_path(directory: str, project: str) -> str:
+    return os.path.join(directory, f"{project}.pvidx")
+
+
+class PageviewIndex:
+    """Read-only title -> daily views table for one project, memory-mapped."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.days, first_day = PAGEVIEW_HEADER.unpack_from(self._mmap, 0)
+        if magic != PAGEVIEW_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a pageview index")
+        self.first_day = date.fromordinal(first_day)
+        self.last_day = self.first_day + timedelta(days=self.days - 1)
+        self._offsets = PAGEVIEW_HEADER.size
+        self._titles = self._offsets + (self.count + 1) * OFFSET.size
+        blob_size = OFFSET.unpack_from(self._mmap, self._offsets + self.count * OFFSET.size)[0]
+        self._counts = _align4(self._titles + blob_size)
+        self._row = struct.Struct(f">{2 * self.days}I")
+
+    def _title(self, i: int) -> bytes:
+        start, end = struct.unpack_from(">QQ", self._mmap, self._offsets + i * OFFSET.size)
+        return self._mmap[self._titles + start:self._titles + end]
+
+    def title_at(self, i: int) -> str:
+        return self._title(i).decode()
+
+    def _find(self, key: bytes) -> Optional[int]:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._title(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.count and self._title(lo) == key else None
+
+    def find(self, title: str) -> Optional[int]:
+        """Row number of a title, or None if it has no views in the index."""
+        return self._find(index_key(title).encode())
+
+    def matrix(self):
+        """All rows as a read-only (titles, 2 * days) uint32 array over the
+        mapped file, without copying; user columns first."""
+        return np.frombuffer(self._mmap, dtype=">u4", count=self.count * 2 * self.days, offset=self._counts).reshape(
+            self.count, 2 * self.days
+        )
+
+    def covers(self, start: date, end: date) -> bool:
+        return self.first_day <= start and end <= self.last_day
+
+    def row(self, title: str) -> Optional[Tuple[int, ...]]:
+        """User then all-agent views for every indexed day, or None."""
+        i = self.find(title)
+        if i is None:
+            return None
+        return self._row.unpack_from(self._mmap, self._counts + i * self._row.size)
+
+    def series(self, title: str, start: date, end: date, agent: str = "user") -> Optional[List[int]]:
+        """Daily views from `start` to `end` inclusive, [] if the title has no
+        views in the index, or None if those days aren't all indexed."""
+        if not self.covers(start, end):
+            return None
+        row = self.row(title)
+        if row is None:
+            return []
+        first = (start - self.first_day).days + (self.days if agent != "user" else 0)
+        return list(row[first:first + (end - start).days + 1])
+
+    def rows(self) -> Iterator[Tuple[str, Tuple[int, ...]]]:
+        """Every (title, row) in title order."""
+        for i in range(self.count):
+            yield self._title(i).decode(), self._row.unpack_from(self._mmap, self._counts + i * self._row.size)
+
+    def close(self):
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+
+def _align4(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def write_index(path: str, first_day: date, days: int, counts: Dict[str, List[int]]) -> int:
+    """Write an index atomically. `counts` maps index keys to 2 * `days`
+    values (user, then all agents). Returns the number of titles."""
+    titles = sorted(counts, key=lambda title: title.encode())
+    return _write_rows(path, first_day, days, ((title.encode(), counts[title]) for title in titles))
+
+
+def _write_rows(path: str, first_day: date, days: int, rows: Iterable[Tuple[bytes, Sequence[int]]]) -> int:
+    """Write an index atomically from (title, views) rows already in title
+    order. The offsets, titles and counts sections are spooled to separate
+    temporary files, so memory use doesn't grow with the title count."""
+    directory = os.path.dirname(path) or "."
+    row = struct.Struct(f">{2 * days}I")
+    tmp_path = f"{path}.tmp"
+    count = 0
+    offset = 0
+    with tempfile.TemporaryFile(dir=directory) as offsets, tempfile.TemporaryFile(dir=directory) as titles, \
+            tempfile.TemporaryFile(dir=directory) as counts:
+        offsets.write(OFFSET.pack(offset))
+        for title, views in rows:
+            titles.write(title)
+            offset += len(title)
+            offsets.write(OFFSET.pack(offset))
+            counts.write(row.pack(*(min(v, 0xFFFFFFFF) for v in views)))
+            count += 1
+
+        with open(tmp_path, "wb") as out:
+            out.write(PAGEVIEW_HEADER.pack(PAGEVIEW_MAGIC, count, days, first_day.toordinal()))
+            for section in (offsets, titles):
+                section.seek(0)
+                shutil.copyfileobj(section, out)
+            position = PAGEVIEW_HEADER.size + (count + 1) * OFFSET.size + offset
+            out.write(b"\0" * (_align4(position) - position))
+            counts.seek(0)
+            shutil.copyfileobj(counts, out)
+    os.replace(tmp_path, path)
+    return count
+
+
+def _open_dump(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def dump_date(path: str) -> date:
+    """Day a dump file covers, from its name (pageviews-YYYYMMDD-...)."""
+    match = _DUMP_DATE.search(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"Can't tell the date of {path}, pass it explicitly")
+    return datetime.strptime(match.group(1), "%Y%m%d").date()
+
+
+def dump_is_user(path: str) -> bool:
+    # Daily dumps are split by agent type in the file name; hourly dumps only count users
+    name = os.path.basename(path)
+    return "-automated" not in name and "-spider" not in name
+
+
+def _project_of(domain: str) -> Optional[str]:
+    # "en" / "en.m" in hourly dumps, "en.wikipedia" in daily ones; sister
+    # projects ("en.b", "en.m.b", "en.wiktionary") are skipped
+    parts = domain.split(".")
+    if parts[-1] == "wikipedia":
+        parts = parts[:-1]
+    if len(parts) == 1 or (len(parts) == 2 and parts[1] == "m"):
+        return parts[0]
+    return None
+
+
+def parse_dump_lines(lines: Iterable[str]) -> Iterator[Tuple[str, str, int]]:
+    """(project, title, views) from hourly ("en.m Title 12 0") or daily
+    pageview complete ("en.wikipedia Title 123 mobile-web 12 A5B7") lines."""
+    for line in lines:
+        fields = line.split(" ")
+        if len(fields) < 3:
+            continue
+        try:
+            if len(fields) >= 5 and fields[3] in ACCESS_METHODS:
+                views = int(fields[4])
+            else:
+                views = int(fields[2])
+        except ValueError:
+            continue
+        project = _project_of(fields[0])
+        if project is not None:
+            yield project, fields[1], views
+
+
+def ingest_dumps(
+    paths: List[str],
+    directory: str = Env.PAGEVIEW_INDEX_DIR,
+    projects: Optional[List[str]] = None,
+    window: int = Env.PAGEVIEW_INDEX_DAYS,
+    day: Optional[date] = None,
+    run_size: int = Env.PAGEVIEW_INGEST_RUN_SIZE,
+) -> Dict[str, int]:
+    """Stream dump files into the per-project indexes in `directory`.
+
+    Files are read line by line and views are summed per project, title
+    and day. Once `run_size` totals are held they're spilled to disk as a
+    sorted run, then the runs and the existing index are merged title by
+    title into a new index that keeps the newest `window` days. Memory use
+    is bounded by `run_size`, not by the number of titles. Views are added
+    to what's already indexed, so each file must be ingested only once.
+    Returns the number of titles written per project.
+    """
+    projects = set(projects or Env.WIKI_PROJECTS)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=directory) as run_dir:
+        runs: Dict[str, List[str]] = {project: [] for project in projects}
+        last_days: Dict[str, date] = {}
+        totals: Dict[str, Dict[Tuple[bytes, int], List[int]]] = {project: {} for project in projects}
+        held = 0
+
+        def spill():
+            nonlocal held
+            for project, project_totals in totals.items():
+                if project_totals:
+                    runs[project].append(_write_run(run_dir, project, len(runs[project]), project_totals))
+                    project_totals.clear()
+            held = 0
+
+        for path in paths:
+            file_day = day or dump_date(path)
+            ordinal = file_day.toordinal()
+            is_user = dump_is_user(path)
+            started = time.perf_counter()
+            lines = 0
+            with _open_dump(path) as f:
+                for project, title, views in parse_dump_lines(f):
+                    lines += 1
+                    if project not in projects:
+                        continue
+                    if last_days.get(project, date.min) < file_day:
+                        last_days[project] = file_day
+                    key = (index_key(title).encode(), ordinal)
+                    counts = totals[project].get(key)
+                    if counts is None:
+                        counts = totals[project][key] = [0, 0]
+                        held += 1
+                    if is_user:
+                        counts[0] += views
+                    counts[1] += views
+                    if held >= run_size:
+                        spill()
+            logger.info(f"Read {lines} lines from {path} in {time.perf_counter() - started:.1f}s")
+        spill()
+
+        return {
+            project: _merge_project(index_path(directory, project), runs[project], last_days[project], window)
+            for project in sorted(last_days)
+        }
+
+
+def _write_run(run_dir: str, project: str, number: int, totals: Dict[Tuple[bytes, int], List[int]]) -> str:
+    # One "title day user total" line per entry, sorted by title then day
+    path = os.path.join(run_dir, f"{project}-{number:05d}.run")
+    with open(path, "wb") as out:
+        for (title, ordinal), (user, total) in sorted(totals.items()):
+            out.write(b"%s %d %d %d\n" % (title, ordinal, user, total))
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[bytes, int, Tuple[int, int]]]:
+    with open(path, "rb") as f:
+        for line in f:
+            title, ordinal, user, total = line.split(b" ")
+            yield title, int(ordinal), (int(user), int(total))
+
+
+def _existing_rows(index: PageviewIndex) -> Iterator[Tuple[bytes, int, Tuple[int, ...]]]:
+    # Day -1 marks a whole indexed row rather than one day's totals
+    for i in range(index.count):
+        yield index._title(i), -1, index._row.unpack_from(index._mmap, index._counts + i * index._row.size)
+
+
+def _merge_project(path: str, runs: List[str], last_day: date, window: int) -> int:
+    """Merge the sorted runs and the existing index into a new index, one
+    title at a time."""
+    existing = PageviewIndex(path) if os.path.exists(path) else None
+    try:
+        if existing is not None:
+            last_day = max(last_day, existing.last_day)
+        first_day = last_day - timedelta(days=window - 1)
+        first_ordinal = first_day.toordinal()
+        shift = (existing.first_day - first_day).days if existing is not None else 0
+
+        sources = [_read_run(run) for run in runs]
+        if existing is not None:
+            sources.append(_existing_rows(existing))
+        merged = heapq.merge(*sources, key=lambda record: record[0])
+
+        def rows():
+            for title, records in itertools.groupby(merged, key=lambda record: record[0]):
+                views = [0] * (2 * window)
+                for _, ordinal, values in records:
+                    if ordinal == -1:
+                        for i in range(existing.days):
+                            target = i + shift
+                            if 0 <= target < window:
+                                views[target] += values[i]
+                                views[window + target] += values[existing.days + i]
+                        continue
+                    target = ordinal - first_ordinal
+                    if 0 <= target < window:  # older days have left the window
+                        views[target] += values[0]
+                        views[window + target] += values[1]
+                if any(views):
+                    yield title, views
+
+        return _write_rows(path, first_day, window, rows())
+    finally:
+        if existing is not None:
+            existing.close()
+
+
+class PageviewIndexStore:
+    """Per-project indexes from a directory, reopened when ingestion replaces them."""
+
+    def __init__(self, directory: Optional[str] = Env.PAGEVIEW_INDEX_DIR, reload_interval: float = Env.PAGEVIEW_INDEX_RELOAD):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._indexes: Dict[str, Optional[PageviewIndex]] = {}
+        self._checked: Dict[str, float] = {}
+        self.stats = {"hits": 0, "absent": 0, "uncovered": 0}
+
+    def get(self, project: str) -> Optional[PageviewIndex]:
+        if not self.directory:
+            return None
+        now = time.monotonic()
+        if now - self._checked.get(project, float("-inf")) < self.reload_interval:
+            return self._indexes.get(project)
+        self._checked[project] = now
+
+        path = index_path(self.directory, project)
+        current = self._indexes.get(project)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        if current is not None and current.mtime == mtime:
+            return current
+        # Replaced files are closed lazily; readers still holding the old map keep working
+        index = None
+        if mtime is not None:
+            try:
+                index = PageviewIndex(path)
+                logger.info(f"Opened pageview index {path}: {index.count} titles, {index.first_day} to {index.last_day}")
+            except (OSError, ValueError, struct.error) as e:
+                logger.error(f"Failed to open pageview index {path}: {e}")
+        self._indexes[project] = index
+        return index
+
+    def series(self, project: str, title: str, start: date, end: date, agent: str = "user") -> Optional[List[int]]:
+        """Daily views from the local index, or None if it doesn't cover the range."""
+        index = self.get(project)
+        if index is None:
+            return None
+        views = index.series(title, start, end, agent)
+        if views is None:
+            self.stats["uncovered"] += 1
+        elif views:
+            self.stats["hits"] += 1
+        else:
+            self.stats["absent"] += 1
+        return views
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "projects": {
+                project: {"titles": index.count, "first_day": str(index.first_day), "last_day": str(index.last_day)}
+                for project, index in self._indexes.items()
+                if index is not None
+            },
+        }
+
+
+pageview_index = PageviewIndexStore()
+
+PAGEVIEW_INDEX_LOOKUPS = metrics.counter("pageview_index_lookups_total", "Local pageview index lookups by outcome", ("result",))
+
+
+def _collect_index_metrics():
+    for result, count in pageview_index.stats.items():
+        PAGEVIEW_INDEX_LOOKUPS.set(count, result=result)
+
+
+metrics.add_collector(_collect_index_metrics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the local pageview index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="merge pageview dump files (.gz, .bz2 or plain) into the index")
+    ingest.add_argument("dumps", nargs="+")
+    ingest.add_argument("--dir", default=Env.PAGEVIEW_INDEX_DIR, required=not Env.PAGEVIEW_INDEX_DIR)
+    ingest.add_argument("--projects", help="comma-separated language codes (default: WIKI_PROJECTS)")
+    ingest.add_argument("--window", type=int, default=Env.PAGEVIEW_INDEX_DAYS, help="days kept in the index")
+    ingest.add_argument("--date", help="YYYYMMDD for every file, instead of reading it from the file names")
+    lookup = commands.add_parser("lookup", help="print the indexed daily views of an article")
+    lookup.add_argument("title")
+    lookup.add_argument("--project", default=Env.WIKI_DEFAULT_PROJECT)
+    lookup.add_argument("--dir", default=Env.PAGEVIEW_INDEX_DIR, required=not Env.PAGEVIEW_INDEX_DIR)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        day = datetime.strptime(args.date, "%Y%m%d").date() if args.date else None
+        projects = args.projects.split(",") if args.projects else None
+        for project, count in ingest_dumps(args.dumps, args.dir, projects, args.window, day).items():
+            print(f"{project}: {count} titles in {index_path(args.dir, project)}")
+        return
+
+    path = index_path(args.dir, args.project)
+    if not os.path.exists(path):
+        print(f"No index at {path}")
+        sys.exit(1)
+    index = PageviewIndex(path)
+    row = index.row(args.title)
+    if row is None:
+        print(f"{args.title} is not in {path}")
+        sys.exit(1)
+    for i in range(index.days):
+        day = index.first_day + timedelta(days=i)
+        print(f"{day}  user {row[i]:>10}  all-agents {row[index.days + i]:>10}")
+
+
+if __name__ == "__main__":
+    main()
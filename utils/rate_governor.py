@@ -0,0 +1,225 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from config.env import Env
+from utils.metrics import metrics
+
+# Statuses that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUSES = {429, 503}
+
+
+def endpoint_for_url(url: str) -> str:
+    """Rate-limit bucket an outbound URL belongs to."""
+    parsed = urlparse(url)
+    host, path = parsed.netloc, parsed.path
+    if host.endswith("ipstack.com"):
+        return "ipstack"
+    if "/metrics/pageviews" in path:
+        return "pageviews"
+    if "/api/rest_v1/feed" in path:
+        return "feed"
+    if path.endswith("/w/api.php"):
+        return "action"
+    return host
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket whose waiters are served first come, first served."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # FIFO, so waiters are queued fairly
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit tuned by AIMD from observed latency and errors.
+
+    Grows by roughly one slot per `limit` healthy responses and shrinks
+    multiplicatively on throttling, errors or latency above twice the
+    target. Waiters are woken in arrival order.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_latency: float):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._waiters: deque = deque()
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # slot was handed over just as we were cancelled
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def record(self, latency: float, healthy: bool):
+        if healthy and latency <= self.target_latency * 2:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+        else:
+            self.limit = max(self.minimum, self.limit * 0.7)
+
+
+class EndpointGovernor:
+    """Token bucket, Retry-After pause and adaptive concurrency for one endpoint."""
+
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AdaptiveLimiter(
+            initial=Env.GOVERNOR_INITIAL_CONCURRENCY,
+            minimum=1,
+            maximum=Env.HTTP_PER_HOST_LIMIT,
+            target_latency=Env.GOVERNOR_TARGET_LATENCY,
+        )
+        self.paused_until = 0.0
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "waited_seconds": 0.0}
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def slot(self):
+        started = time.monotonic()
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        await self.bucket.acquire()
+        await self.limiter.acquire()
+        self.stats["waited_seconds"] += time.monotonic() - started
+        self.stats["requests"] += 1
+        try:
+            yield
+        finally:
+            self.limiter.release()
+
+    def observe(self, latency: float, status: Optional[int] = None, retry_after: Optional[str] = None):
+        """Feed back one response (or a transport error, when `status` is None)."""
+        throttled = status in THROTTLE_STATUSES
+        failed = status is None or status >= 500
+        if throttled:
+            self.stats["throttled"] += 1
+            self.pause(parse_retry_after(retry_after) or Env.GOVERNOR_DEFAULT_PAUSE)
+        elif failed:
+            self.stats["errors"] += 1
+        self.limiter.record(latency, healthy=not (throttled or failed))
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "queued": len(self.limiter._waiters),
+            "paused_for": round(max(self.paused_until - time.monotonic(), 0.0), 2),
+        }
+
+
+class RateGovernor:
+    """Central registry of per-endpoint governors for all outbound calls.
+
+    Calls made for a wiki project get a governor of their own per endpoint
+    ("action:de"), so a burst on one wiki can't use up another's budget.
+    """
+
+    def __init__(self, rates: Dict[str, float], default_rate: float):
+        self.rates = rates
+        self.default_rate = default_rate
+        self._endpoints: Dict[str, EndpointGovernor] = {}
+
+    def for_url(self, url: str, project: Optional[str] = None) -> EndpointGovernor:
+        endpoint = endpoint_for_url(url)
+        name = f"{endpoint}:{project}" if project else endpoint
+        governor = self._endpoints.get(name)
+        if governor is None:
+            rate = self.rates.get(endpoint, self.default_rate)
+            governor = self._endpoints[name] = EndpointGovernor(name, rate, burst=rate * 2)
+        return governor
+
+    def get_stats(self) -> dict:
+        return {name: governor.get_stats() for name, governor in self._endpoints.items()}
+
+
+rate_governor = RateGovernor(
+    rates={
+        "action": Env.RATE_ACTION_API,
+        "pageviews": Env.RATE_PAGEVIEWS_API,
+        "feed": Env.RATE_FEED_API,
+        "ipstack": Env.RATE_IPSTACK,
+    },
+    default_rate=Env.RATE_DEFAULT,
+)
+
+UPSTREAM_CONCURRENCY = metrics.gauge("upstream_concurrency_limit", "Adaptive concurrency limit per endpoint", ("endpoint",))
+UPSTREAM_IN_FLIGHT = metrics.gauge("upstream_in_flight", "Outbound requests in flight per endpoint", ("endpoint",))
+UPSTREAM_QUEUED = metrics.gauge("upstream_queued", "Outbound requests waiting for a slot per endpoint", ("endpoint",))
+UPSTREAM_THROTTLED = metrics.counter("upstream_throttled_total", "429/503 responses per endpoint", ("endpoint",))
+
+
+def _collect_governor_metrics():
+    for name, stats in rate_governor.get_stats().items():
+        UPSTREAM_CONCURRENCY.set(stats["concurrency_limit"], endpoint=name)
+        UPSTREAM_IN_FLIGHT.set(stats["in_flight"], endpoint=name)
+        UPSTREAM_QUEUED.set(stats["queued"], endpoint=name)
+        UPSTREAM_THROTTLED.set(stats["throttled"], endpoint=name)
+
+
+metrics.add_collector(_collect_governor_metrics)
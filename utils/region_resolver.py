@@ -0,0 +1,241 @@
+import asyncio
+import csv
+import ipaddress
+import json
+import mmap
+import struct
+import sys
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from loguru import logger
+
+from config.env import Env
+from utils.cache import LRUCache, _MISSING
+from utils.wikipedia_helper import get_region_from_ip
+
+# Local range database layout (all integers big-endian):
+#   header : magic, record count, label count, offset of the label table
+#   records: start (16 bytes), end (16 bytes), label index (uint32)
+#   labels : one JSON object per line, same shape as the ipstack fields we use
+# Addresses are stored as 16-byte IPv6 (IPv4 as ::ffff:a.b.c.d), so records
+# compare as plain bytes and a single sorted table covers both families.
+GEOIP_MAGIC = b"WGEOIP01"
+GEOIP_HEADER = struct.Struct(">8sIIQ")
+GEOIP_RECORD = struct.Struct(">16s16sI")
+
+# ipstack fields kept in the local database and in history rows
+REGION_FIELDS = ["country_code", "country_name", "region_code", "region_name", "city"]
+
+
+def packed_ip(ip: str) -> Optional[bytes]:
+    """16-byte form of an IPv4/IPv6 address, or None if it isn't one."""
+    try:
+        address = ipaddress.ip_address(ip.strip())
+    except ValueError:
+        return None
+    if address.version == 4:
+        address = ipaddress.IPv6Address(b"\x00" * 10 + b"\xff\xff" + address.packed)
+    return address.packed
+
+
+def is_public_ip(ip: str) -> bool:
+    try:
+        return ipaddress.ip_address(ip.strip()).is_global
+    except ValueError:
+        return False
+
+
+class GeoIPDatabase:
+    """Read-only IP range -> region table, memory-mapped and binary searched."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, label_count, labels_offset = GEOIP_HEADER.unpack_from(self._mmap, 0)
+        if magic != GEOIP_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a GeoIP range database")
+        # Labels are few (one per distinct region) so they live in memory
+        self.labels = [json.loads(line) for line in self._mmap[labels_offset:].splitlines()[:label_count]]
+
+    def lookup(self, ip: str) -> Optional[dict]:
+        key = packed_ip(ip)
+        if key is None:
+            return None
+
+        # Last record whose start <= key
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = GEOIP_HEADER.size + mid * GEOIP_RECORD.size
+            start = self._mmap[offset:offset + 16]
+            if start <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        _, end, label = GEOIP_RECORD.unpack_from(self._mmap, GEOIP_HEADER.size + (lo - 1) * GEOIP_RECORD.size)
+        return self.labels[label] if key <= end else None
+
+    def close(self):
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+
+def _csv_range(row: dict):
+    if row.get("network"):
+        network = ipaddress.ip_network(row["network"].strip(), strict=False)
+        return packed_ip(str(network[0])), packed_ip(str(network[-1]))
+    return packed_ip(row["start_ip"]), packed_ip(row["end_ip"])
+
+
+def build_geoip_database(csv_path: str, output_path: str) -> int:
+    """Build a range database from a CSV file.
+
+    Each row needs either a `network` (CIDR) column or `start_ip`/`end_ip`
+    columns, plus any of REGION_FIELDS. Ranges must not overlap.
+    Returns the number of ranges written.
+    """
+    label_index: Dict[str, int] = {}
+    records = []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            start, end = _csv_range(row)
+            if start is None or end is None:
+                raise ValueError(f"Invalid range in row: {row}")
+            label = json.dumps({field: row[field] for field in REGION_FIELDS if row.get(field)}, sort_keys=True)
+            records.append((start, end, label_index.setdefault(label, len(label_index))))
+    records.sort()
+
+    labels = b"".join(label.encode() + b"\n" for label in label_index)
+    labels_offset = GEOIP_HEADER.size + len(records) * GEOIP_RECORD.size
+    with open(output_path, "wb") as out:
+        out.write(GEOIP_HEADER.pack(GEOIP_MAGIC, len(records), len(label_index), labels_offset))
+        for record in records:
+            out.write(GEOIP_RECORD.pack(*record))
+        out.write(labels)
+    return len(records)
+
+
+class RegionResolver:
+    """IP -> region lookups that never make the caller wait on the network.
+
+    `lookup_local` answers from the in-process LRU, then from the local GeoIP
+    database if one is configured. Addresses neither knows about are resolved
+    remotely in the background by `resolve_later`, which hands the result to
+    a callback once it arrives; concurrent lookups of one address share a
+    single remote call.
+    """
+
+    def __init__(
+        self,
+        remote: Callable[[str], Awaitable[Optional[dict]]],
+        database_path: Optional[str] = Env.GEOIP_DATABASE_PATH,
+        max_entries: int = Env.REGION_CACHE_SIZE,
+        ttl: float = Env.REGION_CACHE_TTL,
+        remote_timeout: float = Env.REGION_REMOTE_TIMEOUT,
+    ):
+        self.remote = remote
+        self.ttl = ttl
+        self.remote_timeout = remote_timeout
+        self.cache = LRUCache(max_entries)
+        self.database: Optional[GeoIPDatabase] = None
+        if database_path:
+            try:
+                self.database = GeoIPDatabase(database_path)
+                logger.info(f"Loaded GeoIP database {database_path} ({self.database.count} ranges)")
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load GeoIP database {database_path}: {e}")
+        self.stats = {"cache_hits": 0, "database_hits": 0, "remote_lookups": 0, "remote_failures": 0}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    def _lookup(self, ip: str):
+        # Region if known locally (None when known to be unresolvable),
+        # otherwise the cache's missing sentinel
+        region = self.cache.get(ip)
+        if region is not _MISSING:
+            self.stats["cache_hits"] += 1
+            return region
+        if self.database is not None:
+            region = self.database.lookup(ip)
+            if region is not None:
+                self.stats["database_hits"] += 1
+                self.cache.set(ip, region, time.time() + self.ttl)
+                return region
+        if not is_public_ip(ip):
+            # Loopback/private ranges: nothing the remote API can tell us
+            self.cache.set(ip, None, time.time() + self.ttl)
+            return None
+        return _MISSING
+
+    def lookup_local(self, ip: str) -> Optional[dict]:
+        """Region for `ip` from the cache or GeoIP database, None if unknown."""
+        region = self._lookup(ip)
+        return None if region is _MISSING else region
+
+    async def _fetch_remote(self, ip: str) -> Optional[dict]:
+        self.stats["remote_lookups"] += 1
+        try:
+            region = await asyncio.wait_for(self.remote(ip), timeout=self.remote_timeout)
+        except Exception as e:
+            region = None
+            logger.warning(f"Remote region lookup for {ip} failed: {e!r}")
+        if region is None:
+            # Not cached, so the next search from this address tries again
+            self.stats["remote_failures"] += 1
+        else:
+            self.cache.set(ip, region, time.time() + self.ttl)
+        return region
+
+    async def resolve(self, ip: str) -> Optional[dict]:
+        """Region for `ip`, going to the remote API only if needed."""
+        region = self._lookup(ip)
+        if region is not _MISSING:
+            return region
+        task = self._in_flight.get(ip)
+        if task is None:
+            task = self._in_flight[ip] = asyncio.create_task(self._fetch_remote(ip))
+            task.add_done_callback(lambda _: self._in_flight.pop(ip, None))
+        return await asyncio.shield(task)
+
+    def resolve_later(self, ip: str, callback: Callable[[Optional[dict]], Awaitable[None]]):
+        """Resolve `ip` in the background, then await `callback(region)`."""
+        async def run():
+            await callback(await self.resolve(ip))
+
+        task = asyncio.create_task(run())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def stop(self):
+        """Wait for background resolutions so their callbacks still run."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self.database is not None:
+            self.database.close()
+            self.database = None
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "cached": len(self.cache),
+            "pending": len(self._pending),
+            "database_ranges": self.database.count if self.database is not None else 0,
+        }
+
+
+region_resolver = RegionResolver(remote=get_region_from_ip)
+
+
+if __name__ == "__main__":
+    # python -m utils.region_resolver ranges.csv geoip.bin
+    if len(sys.argv) != 3:
+        print("usage: python -m utils.region_resolver <ranges.csv> <output.bin>")
+        sys.exit(1)
+    count = build_geoip_database(sys.argv[1], sys.argv[2])
+    print(f"Wrote {count} ranges to {sys.argv[2]}")
@@ -0,0 +1,34 @@
+import json
+from typing import AsyncIterable, Iterable, Union
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request, stream: bool = False) -> bool:
+    """True if the client asked for NDJSON via `?stream=true` or the Accept header."""
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _encode(record) -> bytes:
+    return (json.dumps(record, default=str) + "\n").encode()
+
+
+async def _encode_async(records: AsyncIterable):
+    async for record in records:
+        yield _encode(record)
+
+
+def ndjson_response(records: Union[Iterable, AsyncIterable]) -> StreamingResponse:
+    """Stream records as newline-delimited JSON, one line per record as it is produced.
+
+    Sync iterables are consumed in Starlette's threadpool, so blocking sources
+    like DB cursors don't stall the event loop.
+    """
+    if hasattr(records, "__aiter__"):
+        body = _encode_async(records)
+    else:
+        body = (_encode(record) for record in records)
+    return StreamingResponse(body, media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from datetime import date, timedelta
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence
+
+from loguru import logger
+
+from config.env import Env
+from utils.lazy_imports import LazyModule
+from utils.pageview_index import PageviewIndex
+
+np = LazyModule("numpy")
+
+# Namespaces that aren't articles, by their canonical English names (valid on
+# every wiki) plus each edition's local names. Titles in the dumps are as
+# requested, so both spellings show up.
+CANONICAL_NAMESPACES = (
+    "Media", "Special", "Talk", "User", "User_talk", "Wikipedia", "Wikipedia_talk", "File", "File_talk",
+    "Image", "MediaWiki", "MediaWiki_talk", "Template", "Template_talk", "Help", "Help_talk", "Category",
+    "Category_talk", "Portal", "Portal_talk", "Draft", "Draft_talk", "Module", "Module_talk", "TimedText",
+    "TimedText_talk", "Project", "Project_talk", "WP",
+)
+LOCAL_NAMESPACES = {
+    "de": ("Spezial", "Diskussion", "Benutzer", "Benutzer_Diskussion", "Wikipedia_Diskussion", "Datei",
+           "Datei_Diskussion", "Vorlage", "Vorlage_Diskussion", "Hilfe", "Hilfe_Diskussion", "Kategorie",
+           "Kategorie_Diskussion", "Portal_Diskussion", "Modul", "Modul_Diskussion"),
+    "fr": ("Spécial", "Discussion", "Utilisateur", "Discussion_utilisateur", "Wikipédia", "Discussion_Wikipédia",
+           "Fichier", "Discussion_fichier", "Modèle", "Discussion_modèle", "Aide", "Discussion_aide", "Catégorie",
+           "Discussion_catégorie", "Portail", "Discussion_Portail", "Projet", "Discussion_Projet", "Référence"),
+    "ja": ("特別", "ノート", "利用者", "利用者‐会話", "Wikipedia‐ノート", "ファイル", "ファイル‐ノート", "Template‐ノート",
+           "Help‐ノート", "Category‐ノート", "Portal‐ノート", "プロジェクト", "プロジェクト‐ノート", "モジュール"),
+    "es": ("Especial", "Discusión", "Usuario", "Usuario_discusión", "Wikipedia_discusión", "Archivo",
+           "Archivo_discusión", "Plantilla", "Plantilla_discusión", "Ayuda", "Ayuda_discusión", "Categoría",
+           "Categoría_discusión", "Portal_discusión", "Wikiproyecto", "Anexo", "Anexo_discusión", "Módulo"),
+}
+# Main pages that are in the article namespace; the rest are caught by their namespace
+MAIN_PAGES = {"en": "Main_Page", "ja": "メインページ"}
+
+
+def _excluded_prefixes(project: str) -> FrozenSet[str]:
+    return frozenset(name.casefold() for name in CANONICAL_NAMESPACES + LOCAL_NAMESPACES.get(project, ()))
+
+
+# Precomputed once per project
+EXCLUDED_PREFIXES: Dict[str, FrozenSet[str]] = {project: _excluded_prefixes(project) for project in Env.WIKI_PROJECTS}
+
+
+def is_article(project: str, title: str) -> bool:
+    """False for main pages, non-article namespaces and the dumps' "-" placeholder."""
+    if title == "-" or title == MAIN_PAGES.get(project):
+        return False
+    prefix, colon, _ = title.partition(":")
+    if not colon:
+        return True
+    excluded = EXCLUDED_PREFIXES.get(project)
+    if excluded is None:
+        excluded = EXCLUDED_PREFIXES[project] = _excluded_prefixes(project)
+    return prefix.replace(" ", "_").casefold() not in excluded
+
+
+class TrendingEngine:
+    """Scores one project's articles by how far their latest views run ahead
+    of their own baseline.
+
+    Keeps a dense (candidates, baseline + window days) matrix of daily user
+    views as a ring buffer, with running sums for the baseline and the
+    recent window. `add_day` shifts in one new day by updating only those
+    sums. The score is the recent daily mean's excess over the baseline mean,
+    divided by sqrt(baseline mean + smoothing): a Poisson-style z-score, so
+    a jump from 100 to 5,000 views outranks a steady article with 1M views.
+    """
+
+    def __init__(
+        self,
+        project: str,
+        window: int = Env.TRENDING_WINDOW_DAYS,
+        baseline: int = Env.TRENDING_BASELINE_DAYS,
+        min_views: int = Env.TRENDING_MIN_VIEWS,
+        smoothing: float = Env.TRENDING_SMOOTHING,
+    ):
+        self.project = project
+        self.window = window
+        self.baseline = baseline
+        self.days = window + baseline
+        self.min_views = min_views
+        self.smoothing = smoothing
+        self.last_day: Optional[date] = None
+        self.titles: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._reset(0)
+
+    def _reset(self, capacity: int):
+        self.views = np.zeros((capacity, self.days), dtype=np.int64)
+        self.recent_sum = np.zeros(capacity, dtype=np.int64)
+        self.baseline_sum = np.zeros(capacity, dtype=np.int64)
+        self.head = 0  # ring buffer column holding the oldest day
+        self.size = 0
+
+    def _grow(self, needed: int):
+        capacity = len(self.views)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 64)
+        for name in ("views", "recent_sum", "baseline_sum"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _append(self, titles: Sequence[str], history) -> None:
+        """Add candidates with `history`: (len(titles), days) views, oldest first."""
+        start = self.size
+        self._grow(start + len(titles))
+        history = np.asarray(history, dtype=np.int64)
+        # Chronological column i lives at ring column (head + i) % days
+        self.views[start:start + len(titles), (self.head + np.arange(self.days)) % self.days] = history
+        self.baseline_sum[start:start + len(titles)] = history[:, :self.baseline].sum(axis=1)
+        self.recent_sum[start:start + len(titles)] = history[:, self.baseline:].sum(axis=1)
+        for offset, title in enumerate(titles):
+            self._rows[title] = start + offset
+        self.titles.extend(titles)
+        self.size += len(titles)
+
+    def load(self, titles: Sequence[str], history, last_day: date):
+        """Replace the candidate set. `history` is (len(titles), days) daily
+        views ending on `last_day`, oldest first."""
+        with self._lock:
+            self.titles = []
+            self._rows = {}
+            self._reset(len(titles))
+            self._append(titles, history)
+            self.last_day = last_day
+
+    def add_day(self, day: date, views: Dict[str, int], history: Optional[Callable[[str], Sequence[int]]] = None):
+        """Shift in the views for the day after `last_day`.
+
+        Titles missing from `views` had no views that day. New titles with
+        at least `min_views` become candidates, with their earlier days from
+        `history(title)` (all `days` days, oldest first, ending on `day`) or
+        zeros.
+        """
+        with self._lock:
+            if self.last_day is not None and day != self.last_day + timedelta(days=1):
+                raise ValueError(f"Expected views for {self.last_day + timedelta(days=1)}, got {day}")
+            n = self.size
+            column = np.zeros(n, dtype=np.int64)
+            new_titles = []
+            for title, count in views.items():
+                row = self._rows.get(title)
+                if row is not None:
+                    column[row] = count
+                elif count >= self.min_views and is_article(self.project, title):
+                    new_titles.append(title)
+
+            oldest = self.head
+            first_recent = (self.head + self.baseline) % self.days
+            self.baseline_sum[:n] += self.views[:n, first_recent] - self.views[:n, oldest]
+            self.recent_sum[:n] += column - self.views[:n, first_recent]
+            self.views[:n, oldest] = column
+            self.head = (self.head + 1) % self.days
+            self.last_day = day
+
+            if new_titles:
+                rows = []
+                for title in new_titles:
+                    past = list(history(title)) if history is not None else None
+                    if not past:
+                        past = [0] * (self.days - 1) + [views[title]]
+                    rows.append(past[-self.days:])
+                self._append(new_titles, rows)
+
+    def scores(self):
+        n = self.size
+        recent = self.recent_sum[:n] / self.window
+        base = self.baseline_sum[:n] / self.baseline
+        return recent, base, (recent - base) / np.sqrt(base + self.smoothing)
+
+    def top(self, k: int = Env.TRENDING_TOP_K) -> List[dict]:
+        """The k highest scoring articles whose recent daily mean reaches
+        `min_views`, best first."""
+        with self._lock:
+            recent, base, score = self.scores()
+            eligible = np.flatnonzero(recent >= self.min_views).tolist()
+            best = heapq.nlargest(k, eligible, key=score.__getitem__)
+            return [
+                {
+                    "title": self.titles[row],
+                    "views": float(recent[row]),
+                    "baseline": float(base[row]),
+                    "score": round(float(score[row]), 2),
+                }
+                for row in best
+            ]
+
+    def refresh_from_index(self, index: Optional[PageviewIndex]) -> bool:
+        """Bring the engine up to the index's last day: one incremental day
+        when the index moved on by one, a full reload otherwise. Returns
+        False if there's no index or it holds fewer days than the engine needs."""
+        if index is None or index.days < self.days:
+            return False
+        with self._lock:
+            if self.last_day != index.last_day:
+                self._refresh(index)
+        return True
+
+    def _refresh(self, index: PageviewIndex):
+        matrix = index.matrix()
+        if self.last_day is not None and index.last_day == self.last_day + timedelta(days=1):
+            newest = matrix[:, index.days - 1]
+            views = {}
+            for title in self.titles:
+                row = index.find(title)
+                if row is not None:
+                    views[title] = int(newest[row])
+            for row in np.flatnonzero(newest >= self.min_views).tolist():
+                views.setdefault(index.title_at(row), int(newest[row]))
+
+            def history(title):
+                return matrix[index.find(title), index.days - self.days:index.days].tolist()
+
+            self.add_day(index.last_day, views, history)
+            logger.info(f"Trending {self.project}: added {index.last_day}, {self.size} candidates")
+            return
+
+        # Candidates: articles whose recent daily mean reaches min_views
+        user = matrix[:, index.days - self.days:index.days]
+        recent = user[:, self.baseline:].sum(axis=1) / self.window
+        rows = [row for row in np.flatnonzero(recent >= self.min_views).tolist() if is_article(self.project, index.title_at(row))]
+        self.load([index.title_at(row) for row in rows], user[rows], index.last_day)
+        logger.info(f"Trending {self.project}: loaded {self.size} candidates up to {index.last_day}")
+
+
+class TrendingEngines:
+    """One TrendingEngine per wiki project, created on first use."""
+
+    def __init__(self):
+        self._engines: Dict[str, TrendingEngine] = {}
+
+    def get(self, project: str) -> TrendingEngine:
+        engine = self._engines.get(project)
+        if engine is None:
+            engine = self._engines[project] = TrendingEngine(project)
+        return engine
+
+
+trending_engines = TrendingEngines()
@@ -0,0 +1,81 @@
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+from config.env import Env
+
+WIKI_DOMAIN = "wikipedia.org"
+PAGEVIEWS_API = "https://wikimedia.org/api/rest_v1/metrics/pageviews"
+
+
+class WikiProject:
+    """One language edition of Wikipedia and the upstream URLs that serve it.
+
+    `code` ("en", "de", ...) is the key used for connection pools, rate
+    budgets and cache partitions.
+    """
+
+    def __init__(self, code: str):
+        self.code = code
+        self.host = f"{code}.{WIKI_DOMAIN}"
+        self.mobile_host = f"{code}.m.{WIKI_DOMAIN}"
+        self.pageviews_project = f"{code}.wikipedia"
+        self.api_url = f"https://{self.host}/w/api.php"
+
+    def article_url(self, title: str) -> str:
+        return f"https://{self.host}/wiki/{title.replace(' ', '_')}"
+
+    def on_this_day_url(self, month: str, day: str) -> str:
+        return f"https://{self.host}/api/rest_v1/feed/onthisday/all/{month}/{day}"
+
+    def top_pageviews_url(self, date: str) -> str:
+        return f"{PAGEVIEWS_API}/top/{self.pageviews_project}/all-access/{date}"
+
+    def pageviews_url(self, title: str, agent: str, start: str, end: str) -> str:
+        title = quote(title.replace(" ", "_"), safe="")
+        return f"{PAGEVIEWS_API}/per-article/{self.pageviews_project}/all-access/{agent}/{title}/daily/{start}/{end}"
+
+    def __repr__(self):
+        return f"<WikiProject({self.code})>"
+
+
+wiki_projects: Dict[str, WikiProject] = {code: WikiProject(code) for code in Env.WIKI_PROJECTS}
+DEFAULT_PROJECT = Env.WIKI_DEFAULT_PROJECT
+
+
+def get_project(project: Optional[str] = None) -> WikiProject:
+    """Project for a code ("de"), pageviews name ("de.wikipedia") or host
+    ("de.wikipedia.org"); the default project when `project` is empty.
+    Raises ValueError for projects that aren't served."""
+    code = (project or DEFAULT_PROJECT).strip().lower()
+    code = code.split(".", 1)[0]
+    if code not in wiki_projects:
+        raise ValueError(f"Unsupported Wikipedia project '{project}', expected one of {sorted(wiki_projects)}")
+    return wiki_projects[code]
+
+
+def parse_wiki_url(url: str) -> Tuple[WikiProject, str]:
+    """Project and article title for a desktop or mobile Wikipedia article URL.
+
+    The scheme is optional; the title is percent-decoded with underscores
+    turned into spaces. Raises ValueError for anything else.
+    """
+    url = (url or "").strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError("Search query must be a valid Wikipedia URL")
+
+    host = parts.hostname or ""
+    labels = host.split(".")
+    if not host.endswith("." + WIKI_DOMAIN) or len(labels) not in (3, 4) or (len(labels) == 4 and labels[1] != "m"):
+        raise ValueError("Search query must be a valid Wikipedia URL")
+    if not parts.path.startswith("/wiki/") or len(parts.path) == len("/wiki/"):
+        raise ValueError("Search query must be a valid Wikipedia URL")
+
+    project = wiki_projects.get(labels[0])
+    if project is None:
+        raise ValueError(f"Unsupported Wikipedia project '{labels[0]}', expected one of {sorted(wiki_projects)}")
+    title = unquote(parts.path[len("/wiki/"):]).replace("_", " ")
+    return project, title
+
@@ -1,22 +1,39 @@
-from typing import Optional
-import requests
+from typing import List, Optional
+import asyncio
+import httpx
 from loguru import logger
 import datetime
-import pandas as pd
 from datetime import timedelta
 from datetime import datetime as dt
-from sklearn.linear_model import LinearRegression
-import numpy as np
 from urllib.parse import urlparse, unquote
+from config.env import Env
+from utils.http_client import get_http_client
+from utils.cache import cached
+from utils.forecast import forecast, FORECAST_DAYS
+from utils.pageview_index import pageview_index
+from utils.wiki_projects import get_project, parse_wiki_url
+from db.feature_store import load_features, save_features, fresh_structural, fresh_pageviews, normalize_title
 
+# MediaWiki accepts at most 50 titles per query for regular clients
+MAX_TITLES_PER_QUERY = 50
 
+# Limit/continuation parameter prefix for each list-valued page prop
+PROP_PREFIXES = {"categories": "cl", "links": "pl"}
 
-def get_region_from_ip(ip_address: str) -> Optional[str]:
+# Widest pageview window any caller needs; shorter callers slice it
+PAGEVIEW_WINDOW_DAYS = 10
+
+
+async def get_region_from_ip(ip_address: str) -> Optional[dict]:
+    """ipstack location record for an IP, or None. Without IPSTACK_API_KEY
+    no lookup is made."""
+    if not Env.IPSTACK_API_KEY:
+        logger.debug(f"IPSTACK_API_KEY is not set, skipping region lookup for IP {ip_address}")
+        return None
     try:
         # Use ipstack API to get location data
-        access_key = '07eab0c8a7e57efaaaa21261e17817c6'  # Replace with your ipstack API key
-        url = f"http://api.ipstack.com/{ip_address}?access_key={access_key}"
-        response = requests.get(url)
+        url = f"http://api.ipstack.com/{ip_address}"
+        response = await get_http_client().get(url, params={"access_key": Env.IPSTACK_API_KEY})
         response.raise_for_status()  # Ensure we get a valid response
 
         data = response.json()
@@ -24,65 +41,33 @@ def get_region_from_ip(ip_address: str) -> Optional[str]:
         # Extract region
         return data
     
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Log error if the API request fails
         logger.error(f"Failed to retrieve region for IP {ip_address}: {e}")
         return None
     
 
-def get_wikipedia_features(article_url):
-    # Extract article title from URL
-    title = article_url.split("/wiki/")[-1].replace("_", " ")
-
-    # Wikipedia API Base URL
-    api_url = "https://en.wikipedia.org/w/api.php"
-
-    # Get article metadata
-    params = {
-        "action": "query",
-        "titles": title,
-        "prop": "info|categories|links",
-        "format": "json"
+def structural_from_page(page_info: dict, num_categories: int, num_links: int):
+    """Structural feature group from a MediaWiki API info record and prop counts."""
+    return {
+        "article_length": page_info.get("length", 0),  # Article content length
+        "num_categories": num_categories,
+        "num_links": num_links,
+        "touched": page_info.get("touched", "2025-01-01T00:00:00Z"),
     }
-    response = requests.get(api_url, params=params)
-    data = response.json()
-
-    # Extract page ID (Wikipedia API returns data in a nested structure)
-    page_id = list(data["query"]["pages"].keys())[0]
-    page_info = data["query"]["pages"][page_id]
 
+def build_features(title: str, structural: dict, pageviews: list):
+    """Model features for one article from its structural group and daily views."""
     # Get features
     title_length = len(title)
-    article_length = page_info.get("length", 0)  # Article content length
-    num_categories = len(page_info.get("categories", []))
-    num_links = len(page_info.get("links", []))
 
     # Get last edited timestamp
-    last_edit = page_info.get("touched", "2025-01-01T00:00:00Z")
-    last_edit_date = datetime.datetime.strptime(last_edit, "%Y-%m-%dT%H:%M:%SZ")
+    last_edit_date = datetime.datetime.strptime(structural["touched"], "%Y-%m-%dT%H:%M:%SZ")
     recent_edit_days = (datetime.datetime.utcnow() - last_edit_date).days
 
-    # Get Page Views (last 20 days)
-    today = datetime.datetime.today().strftime('%Y%m%d')
-    start_date = (datetime.datetime.today() - datetime.timedelta(days=10)).strftime('%Y%m%d')
-
-    pageviews_url = f"https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/en.wikipedia/all-access/all-agents/{title}/daily/{start_date}/{today}"
-    pageviews_response = requests.get(pageviews_url,headers={"User-Agent": "Mozilla/5.0"})
-    if pageviews_response.status_code == 200:
-        pageviews_data = pageviews_response.json()
-        if "items" not in pageviews_data:
-            logger.error(f"No pageviews data for article {title}")
-            pageviews = [0] * 1
-        else:
-            pageviews = [entry["views"] for entry in pageviews_data["items"]]
-    else:
-        logger.error(f"Error fetching pageviews for {title}: {pageviews_response.status_code}")
-        pageviews = [0] * 1
-
     zero_pageviews_days = pageviews.count(0)
 
     # Calculate pageview trend
-# Calculate pageview trend
     if sum(pageviews[:10]) > 0:
         recent_trend = sum(pageviews[-10:]) / sum(pageviews[:10])
     else:
@@ -92,15 +77,191 @@ def get_wikipedia_features(article_url):
     return {
         "title": title,
         "title_length": title_length,
-        "article_length": article_length,
-        "num_categories": num_categories,
-        "num_links": num_links,
+        "article_length": structural["article_length"],
+        "num_categories": structural["num_categories"],
+        "num_links": structural["num_links"],
         "zero_pageviews_days": zero_pageviews_days,
         "recent_edit_days": recent_edit_days,
         "pageview_trend": recent_trend,
         "pageviews": pageviews
     }
 
+async def fetch_structural(project: str, title: str):
+    return (await query_structural(project, [title]))[title]
+
+async def fetch_pageviews(project: str, title: str):
+    """Daily views over the feature window, or None if the API returned none.
+
+    Days without data are left out, as the API lists them: the model was
+    trained on those lists."""
+    series = await get_pageview_series(project, title, agent="all-agents", fill_missing=False)
+    return [entry["views"] for entry in series if entry["views"] is not None] or None
+
+def store_update(title: str, structural: Optional[dict] = None, pageviews: Optional[list] = None):
+    # Missing articles aren't stored so newly created pages are picked up
+    if structural is not None and not structural["article_length"]:
+        structural = None
+    return {"title": title, "structural": structural, "pageviews": pageviews}
+
+async def get_wikipedia_features(article_url):
+    # Extract the wiki project and article title from the URL
+    project, title = parse_wiki_url(article_url)
+    return await get_article_features(project.code, title)
+
+@cached("features", partition_by="project")
+async def get_article_features(project: str, title: str):
+    # Use fresh feature groups from the store, refetch only the stale ones
+    record = (await load_features(project, [title])).get(normalize_title(title))
+    stored = {"structural": fresh_structural(record), "pageviews": fresh_pageviews(record)}
+
+    fetchers = {"structural": fetch_structural, "pageviews": fetch_pageviews}
+    stale = [group for group, value in stored.items() if value is None]
+    fetched = dict(zip(stale, await asyncio.gather(*(fetchers[group](project, title) for group in stale))))
+    if fetched:
+        await save_features(project, [store_update(title, **fetched)])
+
+    structural = stored["structural"] or fetched["structural"]
+    pageviews = stored["pageviews"] or fetched.get("pageviews") or [0] * 1
+    return build_features(title, structural, pageviews)
+
+
+async def query_info(project: str, titles: List[str]):
+    """`prop=info` records for up to MAX_TITLES_PER_QUERY titles, keyed by the
+    requested title ({} if the API didn't return one)."""
+    params = {
+        "action": "query",
+        "titles": "|".join(titles),
+        "prop": "info",
+        "format": "json"
+    }
+    response = await get_http_client().get(get_project(project).api_url, params=params, project=project)
+    response.raise_for_status()
+    query = response.json().get("query", {})
+
+    normalized = {entry["from"]: entry["to"] for entry in query.get("normalized", [])}
+    pages = {page["title"]: page for page in query.get("pages", {}).values()}
+    return {title: pages.get(normalized.get(title, title), {}) for title in titles}
+
+async def count_page_prop(project: str, titles: List[str], prop: str, cap: int = Env.FEATURE_COUNT_CAP):
+    """Count a list-valued prop ("categories" or "links") for each title.
+
+    Requests the API's maximum page size and follows `continue` tokens until
+    the list is exhausted. A title that reaches `cap` is dropped from the
+    following requests, so one long list doesn't keep paging for the rest of
+    the batch. Counts are capped at `cap`.
+    """
+    prefix = PROP_PREFIXES[prop]
+    api_url = get_project(project).api_url
+    params = {
+        "action": "query",
+        "prop": prop,
+        f"{prefix}limit": "max",
+        "format": "json"
+    }
+    counts = {}
+    normalized = {}
+    continuation = {}
+    pending = list(titles)
+    while True:
+        response = await get_http_client().get(
+            api_url, params={**params, "titles": "|".join(pending), **continuation}, project=project
+        )
+        response.raise_for_status()
+        data = response.json()
+        query = data.get("query", {})
+
+        for entry in query.get("normalized", []):
+            normalized[entry["from"]] = entry["to"]
+        for page in query.get("pages", {}).values():
+            counts[page["title"]] = counts.get(page["title"], 0) + len(page.get(prop, []))
+
+        if "continue" not in data:
+            break
+        # Pages are listed in order, so continuing without the capped titles
+        # resumes at the next page still being counted
+        pending = [title for title in pending if counts.get(normalized.get(title, title), 0) < cap]
+        if not pending:
+            break
+        continuation = data["continue"]
+
+    return {title: min(counts.get(normalized.get(title, title), 0), cap) for title in titles}
+
+async def query_structural(project: str, titles: List[str]):
+    """Structural features for up to MAX_TITLES_PER_QUERY titles.
+
+    The info lookup and the categories and links pagination run concurrently,
+    so complete counts cost about as much latency as the longest stream.
+    """
+    info, categories, links = await asyncio.gather(
+        query_info(project, titles),
+        count_page_prop(project, titles, "categories"),
+        count_page_prop(project, titles, "links"),
+    )
+    return {title: structural_from_page(info[title], categories[title], links[title]) for title in titles}
+
+async def get_wikipedia_features_batch(article_urls: List[str]):
+    """Features for many articles, using grouped multi-title queries for
+    whatever the feature store doesn't have fresh.
+
+    URLs are grouped by wiki project and the projects are fetched
+    concurrently. Returns one entry per URL, in order: a features dict, or
+    the exception raised while parsing or fetching it.
+    """
+    parsed = []
+    titles_by_project = {}
+    for url in article_urls:
+        try:
+            project, title = parse_wiki_url(url)
+        except ValueError as e:
+            parsed.append(e)
+            continue
+        parsed.append((project.code, title))
+        titles_by_project.setdefault(project.code, []).append(title)
+
+    projects = list(titles_by_project)
+    results = await asyncio.gather(*(project_features(project, titles_by_project[project]) for project in projects))
+    features_by_project = dict(zip(projects, results))
+    return [entry if isinstance(entry, Exception) else features_by_project[entry[0]][entry[1]] for entry in parsed]
+
+async def project_features(project: str, titles: List[str]):
+    """Features (or the fetch exception) per title for articles of one wiki project."""
+    unique_titles = list(dict.fromkeys(titles))
+
+    records = await load_features(project, unique_titles)
+    structural = {title: fresh_structural(records.get(normalize_title(title))) for title in unique_titles}
+    pageviews = {title: fresh_pageviews(records.get(normalize_title(title))) for title in unique_titles}
+
+    stale_structural = [title for title in unique_titles if structural[title] is None]
+    stale_pageviews = [title for title in unique_titles if pageviews[title] is None]
+    chunks = [stale_structural[i:i + MAX_TITLES_PER_QUERY] for i in range(0, len(stale_structural), MAX_TITLES_PER_QUERY)]
+
+    page_results, series_results = await asyncio.gather(
+        asyncio.gather(*(query_structural(project, chunk) for chunk in chunks), return_exceptions=True),
+        asyncio.gather(*(fetch_pageviews(project, title) for title in stale_pageviews)),
+    )
+
+    updates = {}
+    for chunk, result in zip(chunks, page_results):
+        for title in chunk:
+            if isinstance(result, Exception):
+                structural[title] = result
+            else:
+                structural[title] = result[title]
+                updates[title] = store_update(title, structural=structural[title])
+    for title, views in zip(stale_pageviews, series_results):
+        pageviews[title] = views
+        if views is not None:
+            updates.setdefault(title, store_update(title))["pageviews"] = views
+    await save_features(project, list(updates.values()))
+
+    features = {}
+    for title in unique_titles:
+        if isinstance(structural[title], Exception):
+            features[title] = structural[title]
+        else:
+            features[title] = build_features(title, structural[title], pageviews[title] or [0] * 1)
+    return features
+
 
 def extract_article_title(wiki_url: str):
     """Extract the article title from a Wikipedia link."""
@@ -108,48 +269,71 @@ def extract_article_title(wiki_url: str):
     title = path.split("/")[-1]  # Get the last part of the URL
     return unquote(title.replace("_", " "))  # Convert URL encoding to normal text
 
-def get_past_week_views(article_title: str):
-    """Fetch past 7 days of views for a given Wikipedia article."""
-    base_url = "https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/en.wikipedia/all-access/user/{}/daily/{}/{}"
-    historical_data = []
-    
-    for i in range(7):
-        date = (dt.now() - timedelta(days=i+1)).strftime('%Y%m%d')
-        url = base_url.format(article_title, date, date)
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        
-        if response.status_code == 200:
-            data = response.json()
-            if "items" in data and len(data["items"]) > 0:
-                views = data["items"][0]["views"]
-                # put - beween date
-                date = date[:4] + "-" + date[4:6] + "-" + date[6:]
-                historical_data.append({"date": date, "views": views})
-    
-    return historical_data
+@cached("pageviews", partition_by="project")
+async def fetch_pageview_items(project: str, article_title: str, agent: str, start: str, end: str):
+    """Raw daily pageview items for an article between two YYYYMMDD dates."""
+    url = get_project(project).pageviews_url(article_title, agent, start, end)
+    response = await get_http_client().get(url, headers={"User-Agent": "Mozilla/5.0"}, project=project)
+    if response.status_code == 404:
+        return []  # The API answers 404 when an article has no views in range
+    response.raise_for_status()
+    return response.json().get("items", [])
 
-def predict_future_views(past_data):
-    """Predict engagement for the next 7 days using Linear Regression."""
-    df = pd.DataFrame(past_data)
-    df['date'] = pd.to_datetime(df['date'])
-    df['days_ago'] = (df['date'].max() - df['date']).dt.days  # Convert date to numeric
+async def get_pageview_series(
+    project: str, article_title: str, days: int = PAGEVIEW_WINDOW_DAYS, agent: str = "user", fill_missing: bool = True
+):
+    """Fetch daily views for the last `days` complete days.
 
-    if len(df) < 2:
-        return []  # Not enough data for prediction
+    Read from the local pageview index when it covers those days, otherwise
+    from the API in a single ranged request. Days without data are filled
+    with explicit zeros, or with None when `fill_missing` is False (the
+    index, like the dumps, has no views for them). The series is returned
+    oldest first, or empty if the article has no data.
+    """
+    missing = 0 if fill_missing else None
+    end = (dt.utcnow() - timedelta(days=1)).date()
+    start = end - timedelta(days=days - 1)
 
-    X = df[['days_ago']].values
-    y = np.log1p(df['views'].values)  # Apply log transformation to stabilize
+    local = pageview_index.series(project, article_title, start, end, agent)
+    if local is not None:
+        return [
+            {"date": (start + timedelta(days=i)).strftime('%Y-%m-%d'), "views": views or missing}
+            for i, views in enumerate(local)
+        ]
 
-    model = LinearRegression().fit(X, y)
+    try:
+        items = await fetch_pageview_items(project, article_title, agent, start.strftime('%Y%m%d'), end.strftime('%Y%m%d'))
+    except httpx.HTTPError as e:
+        logger.error(f"Error fetching pageviews for {article_title}: {e}")
+        return []
 
-    future_days = np.array([df['days_ago'].max() + i for i in range(1, 5)]).reshape(-1, 1)
-    predicted_views = model.predict(future_days)
+    if not items:
+        logger.error(f"No pageviews data for article {article_title}")
+        return []
 
-    future_data = []
-    for i, views in enumerate(predicted_views):
-        future_data.append({
-            "date": (df['date'].max() + timedelta(days=i+1)).strftime('%Y-%m-%d'),
-            "views": max(int(np.expm1(views)), 0)  # Convert back and prevent negatives
-        })
-    
-    return future_data
\ No newline at end of file
+    views_by_day = {item["timestamp"][:8]: item["views"] for item in items}
+    series = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        series.append({"date": day.strftime('%Y-%m-%d'), "views": views_by_day.get(day.strftime('%Y%m%d'), missing)})
+    return series
+
+async def get_past_week_views(project: str, article_title: str):
+    """Fetch past 7 days of views for a given Wikipedia article."""
+    series = await get_pageview_series(project, article_title, agent="user")
+    # Most recent day first, as the chart expects
+    return series[-7:][::-1]
+
+def predict_future_views(past_data, model: str = "log_linear"):
+    """Predict engagement for the next FORECAST_DAYS days from daily views."""
+    if len(past_data) < 2:
+        return []  # Not enough data for prediction
+
+    past = sorted(past_data, key=lambda day: day["date"])
+    predicted_views = forecast([[day["views"] for day in past]], FORECAST_DAYS, model)[0]
+
+    last_date = dt.strptime(past[-1]["date"], '%Y-%m-%d')
+    return [
+        {"date": (last_date + timedelta(days=i + 1)).strftime('%Y-%m-%d'), "views": int(views)}
+        for i, views in enumerate(predicted_views)
+    ]